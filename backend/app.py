@@ -4,6 +4,9 @@ from flask import Flask, jsonify
 from flask_migrate import Migrate
 from config import config
 from extensions import init_extensions, db
+from commands import register_commands
+from utils.json_provider import init_json_provider
+from utils.compression import init_compression
 
 def create_app(config_name=None):
     """应用工厂函数"""
@@ -16,13 +19,21 @@ def create_app(config_name=None):
     # 加载配置
     app.config.from_object(config[config_name])
 
+    # JSON 编码与响应压缩
+    init_json_provider(app)
+    init_compression(app)
+
     # 初始化扩展
     init_extensions(app)
 
+    # 注册命令行命令
+    register_commands(app)
+
     # 注册蓝图
     from routes.auth import auth_bp
     from routes.user import user_bp
     from routes.order import order_bp
+    from routes.media import media_bp
 
     # 使用数据库菜单路由
     from routes.menu import menu_bp
@@ -32,6 +43,7 @@ def create_app(config_name=None):
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(user_bp, url_prefix='/api/users')
     app.register_blueprint(order_bp, url_prefix='/api/orders')
+    app.register_blueprint(media_bp, url_prefix='/api/media')
 
     # 错误处理
     @app.errorhandler(404)
@@ -67,11 +79,19 @@ def create_app(config_name=None):
         try:
             # 检查数据库连接
             from sqlalchemy import text
+            from services.menu_catalog import menu_catalog
+            from utils.db_metrics import pool_metrics
+            from services.event_bus import get_event_bus
+            from services.token_revocation import token_revocation_store
             db.session.execute(text('SELECT 1'))
             return jsonify({
                 'status': 'healthy',
                 'database': 'connected',
-                'app': 'running'
+                'app': 'running',
+                'database_pool': pool_metrics.snapshot(db.engine),
+                'menu_cache': menu_catalog.stats(),
+                'event_bus': get_event_bus().stats(),
+                'token_revocation': token_revocation_store.stats()
             })
         except Exception as e:
             return jsonify({
@@ -0,0 +1,49 @@
+"""Flask命令行命令"""
+import click
+
+
+def register_commands(app):
+    """注册所有命令行命令"""
+
+    @app.cli.command('rebuild-sales-rollup')
+    def rebuild_sales_rollup():
+        """根据订单表重建每日销售汇总"""
+        from models.daily_sales_rollup import DailySalesRollup
+
+        count = DailySalesRollup.rebuild()
+        click.echo(f'每日销售汇总已重建，共 {count} 行')
+
+    @app.cli.command('rebuild-user-stats')
+    def rebuild_user_stats():
+        """根据订单表重建用户订单统计"""
+        from models.user import User
+
+        count = User.rebuild_order_stats()
+        click.echo(f'用户订单统计已重建，共 {count} 个用户有订单')
+
+    @app.cli.command('recompute-popularity')
+    def recompute_popularity():
+        """重算菜单热度分数和热门标记（可配置为定时任务）"""
+        from services.popularity_service import PopularityService
+
+        result = PopularityService.recompute()
+        if result['success']:
+            click.echo(f"热度分数已重算，热门商品: {result['popular_ids']}")
+        else:
+            click.echo(result['errors'][0], err=True)
+
+    @app.cli.command('purge-revoked-tokens')
+    def purge_revoked_tokens():
+        """清理已过期的Token吊销记录（可配置为定时任务）"""
+        from models.revoked_token import RevokedToken
+
+        count = RevokedToken.purge_expired()
+        click.echo(f'已清理 {count} 条过期的Token吊销记录')
+
+    @app.cli.command('purge-orphan-images')
+    def purge_orphan_images():
+        """删除未被菜单项引用的图片文件和遗留的上传临时文件（可配置为定时任务）"""
+        from services.image_pipeline import image_pipeline
+
+        count = image_pipeline.purge_orphans()
+        click.echo(f'已删除 {count} 个未使用的图片文件')
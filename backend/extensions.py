@@ -22,6 +22,11 @@ def init_extensions(app):
     db.init_app(app)
     migrate.init_app(app, db)
 
+    # 连接池监控
+    from utils.db_metrics import pool_metrics
+    with app.app_context():
+        pool_metrics.attach(db.engine)
+
     # 初始化CORS
     cors.init_app(app, origins=app.config['CORS_ORIGINS'])
 
@@ -34,6 +39,10 @@ def init_extensions(app):
     # 初始化bcrypt
     bcrypt.init_app(app)
 
+    # 初始化订单事件总线
+    from services.event_bus import init_event_bus
+    init_event_bus(app)
+
     # 确保上传目录存在
     upload_folder = app.config.get('UPLOAD_FOLDER', 'static/uploads')
     if not os.path.exists(upload_folder):
@@ -55,6 +64,17 @@ def init_extensions(app):
         from flask import jsonify
         return jsonify({'message': '需要Token'}), 401
 
+    # Token吊销检查（登出、角色变更），每个请求只做内存查找
+    @jwt.token_in_blocklist_loader
+    def check_token_revoked(jwt_header, jwt_payload):
+        from services.token_revocation import token_revocation_store
+        return token_revocation_store.is_revoked(jwt_payload)
+
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        from flask import jsonify
+        return jsonify({'message': 'Token已失效'}), 401
+
 def allowed_file(filename, allowed_extensions=None):
     """检查文件扩展名是否被允许"""
     if allowed_extensions is None:
@@ -3,6 +3,9 @@ from .user import User
 from .menu import MenuItem
 from .order import Order
 from .order_item import OrderItem
+from .order_sequence import OrderSequence
+from .daily_sales_rollup import DailySalesRollup
+from .revoked_token import RevokedToken
 
 # 导入所有模型，确保它们在SQLAlchemy中注册
-__all__ = ['User', 'MenuItem', 'Order', 'OrderItem']
\ No newline at end of file
+__all__ = ['User', 'MenuItem', 'Order', 'OrderItem', 'OrderSequence', 'DailySalesRollup', 'RevokedToken']
\ No newline at end of file
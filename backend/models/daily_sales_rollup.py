@@ -0,0 +1,112 @@
+"""每日销售汇总数据模型"""
+from datetime import date
+from extensions import db
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+class DailySalesRollup(db.Model):
+    """每日销售汇总（按日期 × 订单状态）"""
+    __tablename__ = 'daily_sales_rollup'
+
+    sale_date = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.Enum('pending', 'preparing', 'ready', 'completed', 'cancelled'),
+                       primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+    def __init__(self, sale_date, status, order_count=0, revenue=0):
+        """初始化汇总行"""
+        self.sale_date = sale_date
+        self.status = status
+        self.order_count = order_count
+        self.revenue = revenue
+
+    def to_dict(self):
+        """转换为字典"""
+        return {
+            'sale_date': self.sale_date.isoformat(),
+            'status': self.status,
+            'order_count': self.order_count,
+            'revenue': float(self.revenue)
+        }
+
+    @staticmethod
+    def apply(sale_date, status, count_delta, revenue_delta):
+        """在当前会话事务中原子地累加汇总行"""
+        table = DailySalesRollup.__table__
+        result = db.session.execute(
+            table.update()
+            .where(table.c.sale_date == sale_date, table.c.status == status)
+            .values(
+                order_count=table.c.order_count + count_delta,
+                revenue=table.c.revenue + revenue_delta
+            )
+        )
+        if result.rowcount:
+            return
+
+        # 汇总行不存在时插入；并发插入冲突则回滚保存点后改为累加
+        try:
+            with db.session.begin_nested():
+                db.session.execute(table.insert().values(
+                    sale_date=sale_date,
+                    status=status,
+                    order_count=count_delta,
+                    revenue=revenue_delta
+                ))
+        except IntegrityError:
+            db.session.execute(
+                table.update()
+                .where(table.c.sale_date == sale_date, table.c.status == status)
+                .values(
+                    order_count=table.c.order_count + count_delta,
+                    revenue=table.c.revenue + revenue_delta
+                )
+            )
+
+    @staticmethod
+    def record_order(order):
+        """记录新订单"""
+        DailySalesRollup.apply(order.created_at.date(), order.status, 1, order.total_price)
+
+    @staticmethod
+    def move_order(order, old_status, new_status):
+        """订单状态变更时将其从旧状态移到新状态"""
+        if old_status == new_status:
+            return
+        sale_date = order.created_at.date()
+        DailySalesRollup.apply(sale_date, old_status, -1, -order.total_price)
+        DailySalesRollup.apply(sale_date, new_status, 1, order.total_price)
+
+    @staticmethod
+    def get_range(start_date, end_date):
+        """获取日期范围内（含首尾）的汇总行"""
+        return DailySalesRollup.query.filter(
+            DailySalesRollup.sale_date >= start_date,
+            DailySalesRollup.sale_date <= end_date
+        ).order_by(DailySalesRollup.sale_date).all()
+
+    @staticmethod
+    def rebuild():
+        """根据订单表全量重建汇总，返回生成的汇总行数"""
+        from models.order import Order
+
+        sale_date = func.date(Order.created_at)
+        rows = db.session.query(
+            sale_date.label('sale_date'),
+            Order.status,
+            func.count(Order.id),
+            func.sum(Order.total_price)
+        ).group_by(sale_date, Order.status).all()
+
+        DailySalesRollup.query.delete()
+        for day, status, order_count, revenue in rows:
+            if isinstance(day, str):
+                # SQLite 的 DATE() 返回字符串
+                day = date.fromisoformat(day)
+            db.session.add(DailySalesRollup(day, status, order_count, revenue or 0))
+        db.session.commit()
+        return len(rows)
+
+    def __repr__(self):
+        return f'<DailySalesRollup {self.sale_date} {self.status}>'
@@ -13,10 +13,16 @@ class MenuItem(db.Model):
     original_price = db.Column(db.Numeric(10, 2), nullable=True)
     category = db.Column(db.String(50), nullable=False, default='coffee', index=True)
     image_url = db.Column(db.String(255), nullable=True)
+    # 上传图片的内容哈希及各尺寸 WebP 缩略图URL（名称 -> URL，后台生成）
+    image_hash = db.Column(db.String(64), nullable=True, index=True)
+    image_variants = db.Column(db.JSON, nullable=True)
     is_available = db.Column(db.Boolean, default=True, nullable=False, index=True)
     is_popular = db.Column(db.Boolean, default=False, nullable=False, index=True)
     tags = db.Column(db.JSON, nullable=True)
     order_count = db.Column(db.Integer, default=0, nullable=False)
+    popularity_score = db.Column(db.Float, default=0, nullable=False)
+    # 热度分数最近一次重算的时间，各 worker 进程据此判断是否需要重算
+    popularity_updated_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -42,10 +48,13 @@ class MenuItem(db.Model):
             'original_price': float(self.original_price) if self.original_price else None,
             'category': self.category,
             'image_url': self.image_url,
+            'image_variants': self.image_variants,
+            'thumbnail_url': (self.image_variants or {}).get('thumb') or self.image_url,
             'is_available': self.is_available,
             'is_popular': self.is_popular,
             'tags': self.tags,
             'order_count': self.order_count,
+            'popularity_score': self.popularity_score,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -65,7 +74,7 @@ class MenuItem(db.Model):
     def update_from_dict(self, data):
         """从字典更新菜单项"""
         for key, value in data.items():
-            if hasattr(self, key) and key not in ['id', 'created_at', 'order_items']:
+            if hasattr(self, key) and key not in ['id', 'created_at', 'order_items', 'order_count', 'popularity_score', 'popularity_updated_at', 'image_hash', 'image_variants']:
                 setattr(self, key, value)
 
     def get_order_count(self):
@@ -31,8 +31,14 @@ class Order(db.Model):
         self.customer_phone = customer_phone
         self.notes = notes
 
-    def to_dict(self, include_items=False):
-        """转换为字典"""
+    def to_dict(self, include_items=False, items=None):
+        """转换为字典
+
+        items 为预先批量加载的订单项列表，传入时不再访问动态关系查询数据库
+        """
+        if items is None and include_items:
+            items = self.order_items.all()
+
         data = {
             'id': self.id,
             'user_id': self.user_id,
@@ -44,11 +50,11 @@ class Order(db.Model):
             'notes': self.notes,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'item_count': self.order_items.count()
+            'item_count': len(items) if items is not None else self.order_items.count()
         }
 
         if include_items:
-            data['order_items'] = [item.to_dict() for item in self.order_items]
+            data['order_items'] = [item.to_dict() for item in items]
 
         return data
 
@@ -115,20 +121,15 @@ class Order(db.Model):
 
     @staticmethod
     def generate_order_number():
-        """生成订单号"""
+        """生成订单号
+
+        序号由按天的计数器表原子分配，多进程并发下单不会产生重复订单号
+        """
         from datetime import datetime
+        from models.order_sequence import OrderSequence
         date_prefix = datetime.now().strftime('%Y%m%d')
 
-        # 查找当天最大的订单号
-        last_order = Order.query.filter(
-            Order.order_number.like(f'CO{date_prefix}%')
-        ).order_by(Order.order_number.desc()).first()
-
-        if last_order:
-            last_number = int(last_order.order_number[-4:])
-            new_number = last_number + 1
-        else:
-            new_number = 1
+        new_number = OrderSequence.next_value(date_prefix)
 
         return f'CO{date_prefix}{new_number:04d}'
 
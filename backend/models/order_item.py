@@ -14,6 +14,9 @@ class OrderItem(db.Model):
     subtotal = db.Column(db.Numeric(10, 2), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    # 关系 - 在订单项一侧声明，避免菜单模型与订单项模型循环导入
+    menu_item = db.relationship('MenuItem', backref=db.backref('order_items', lazy='dynamic'))
+
     def __init__(self, order_id, menu_id, quantity, unit_price):
         """初始化订单项"""
         self.order_id = order_id
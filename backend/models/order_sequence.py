@@ -0,0 +1,79 @@
+"""订单号序列数据模型"""
+from extensions import db
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+class OrderSequence(db.Model):
+    """按天的订单号计数器"""
+    __tablename__ = 'order_sequences'
+
+    date_key = db.Column(db.String(8), primary_key=True)
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+
+    def __init__(self, date_key, last_value=0):
+        """初始化计数器"""
+        self.date_key = date_key
+        self.last_value = last_value
+
+    @staticmethod
+    def next_value(date_key, max_retries=5):
+        """原子地分配指定日期的下一个序号
+
+        在独立的短事务中执行 UPDATE ... SET last_value = last_value + 1，
+        行锁只持有到该事务提交，不会随订单事务一起阻塞其它下单请求。
+        当天计数行不存在时先在另一个事务中创建，再回到 UPDATE 分配序号：
+        若在 0 行 UPDATE 的同一事务中 INSERT，InnoDB 上两个进程各自持有间隙锁后
+        互相等待对方的插入而死锁。并发创建时的主键冲突和死锁都会重试
+        """
+        table = OrderSequence.__table__
+
+        for _ in range(max_retries):
+            try:
+                with db.engine.begin() as conn:
+                    result = conn.execute(
+                        table.update()
+                        .where(table.c.date_key == date_key)
+                        .values(last_value=table.c.last_value + 1)
+                    )
+                    if result.rowcount:
+                        return conn.execute(
+                            select(table.c.last_value).where(table.c.date_key == date_key)
+                        ).scalar()
+
+                # 当天第一单：创建计数行，从已有订单号续接（兼容启用计数器之前生成的订单）
+                with db.engine.begin() as conn:
+                    conn.execute(table.insert().values(
+                        date_key=date_key,
+                        last_value=OrderSequence._last_used_value(conn, date_key)
+                    ))
+            except IntegrityError:
+                # 计数行已被其它进程创建，重试走更新分支
+                continue
+            except OperationalError as e:
+                if not OrderSequence._is_retryable(e):
+                    raise
+                continue
+
+        raise RuntimeError('订单号分配失败')
+
+    @staticmethod
+    def _is_retryable(error):
+        """死锁（MySQL 1213）或锁等待超时（1205）可以重试"""
+        args = getattr(error.orig, 'args', ())
+        return bool(args) and args[0] in (1205, 1213)
+
+    @staticmethod
+    def _last_used_value(conn, date_key):
+        """查找当天已使用的最大序号"""
+        from models.order import Order
+
+        last_number = conn.execute(
+            select(Order.order_number)
+            .where(Order.order_number.like(f'CO{date_key}%'))
+            .order_by(Order.order_number.desc())
+            .limit(1)
+        ).scalar()
+        return int(last_number[-4:]) if last_number else 0
+
+    def __repr__(self):
+        return f'<OrderSequence {self.date_key}:{self.last_value}>'
@@ -0,0 +1,37 @@
+"""已吊销Token数据模型"""
+from datetime import datetime
+from extensions import db
+
+class RevokedToken(db.Model):
+    """已吊销的Token
+
+    token_type 为 access/refresh 时按 jti 吊销单个Token；为 user 时表示吊销该用户
+    在 revoked_at 之前签发的全部Token（角色变更、删除用户）。expires_at 之后记录即可清理
+    """
+    __tablename__ = 'revoked_tokens'
+
+    jti = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, nullable=True, index=True)
+    token_type = db.Column(db.Enum('access', 'refresh', 'user'), nullable=False)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __init__(self, jti, token_type, expires_at, user_id=None, revoked_at=None):
+        """初始化吊销记录"""
+        self.jti = jti
+        self.token_type = token_type
+        self.expires_at = expires_at
+        self.user_id = user_id
+        self.revoked_at = revoked_at or datetime.utcnow()
+
+    @staticmethod
+    def purge_expired(now=None):
+        """删除已过期的吊销记录，返回删除的行数"""
+        count = RevokedToken.query.filter(
+            RevokedToken.expires_at < (now or datetime.utcnow())
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return count
+
+    def __repr__(self):
+        return f'<RevokedToken {self.token_type} {self.jti}>'
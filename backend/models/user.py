@@ -1,7 +1,8 @@
 """用户数据模型"""
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from extensions import db, bcrypt
+from extensions import db
+from utils.password_hasher import password_hasher
 
 class User(db.Model):
     """用户模型"""
@@ -13,6 +14,11 @@ class User(db.Model):
     password = db.Column(db.String(255), nullable=False)
     role = db.Column(db.Enum('admin', 'user'), default='user', nullable=False)
     phone = db.Column(db.String(20), nullable=True)
+    # 订单统计（由订单服务在下单、取消时维护，可通过 flask rebuild-user-stats 重建）
+    order_count = db.Column(db.Integer, default=0, nullable=False)
+    total_spent = db.Column(db.Numeric(12, 2), default=0, nullable=False)
+    first_order_at = db.Column(db.DateTime, nullable=True)
+    last_order_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -29,13 +35,17 @@ class User(db.Model):
 
     def set_password(self, password):
         """设置密码（加密存储）"""
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password = password_hasher.hash(password)
 
     def check_password(self, password):
         """验证密码"""
-        return bcrypt.check_password_hash(self.password, password)
+        return password_hasher.verify(self.password, password)
 
-    def to_dict(self, include_sensitive=False):
+    def password_needs_rehash(self):
+        """密码哈希的 cost 与当前配置不一致时返回 True"""
+        return password_hasher.needs_rehash(self.password)
+
+    def to_dict(self, include_sensitive=False, include_stats=False):
         """转换为字典"""
         data = {
             'id': self.id,
@@ -46,6 +56,11 @@ class User(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+        if include_stats:
+            data['order_count'] = self.order_count or 0
+            data['total_spent'] = float(self.total_spent) if self.total_spent else 0.0
+            data['first_order_at'] = self.first_order_at.isoformat() if self.first_order_at else None
+            data['last_order_at'] = self.last_order_at.isoformat() if self.last_order_at else None
         if include_sensitive:
             data['password'] = self.password
         return data
@@ -75,14 +90,75 @@ class User(db.Model):
 
     def get_order_count(self):
         """获取用户订单数量"""
-        return self.orders.count()
+        return self.order_count or 0
 
     def get_total_spent(self):
-        """获取用户总消费金额"""
-        from sqlalchemy import func
+        """获取用户总消费金额（不含已取消订单）"""
+        return float(self.total_spent) if self.total_spent else 0.0
+
+    @staticmethod
+    def record_order(user_id, amount, ordered_at):
+        """在当前会话事务中累加用户订单统计"""
+        table = User.__table__
+        db.session.execute(
+            table.update().where(table.c.id == user_id).values(
+                order_count=table.c.order_count + 1,
+                total_spent=table.c.total_spent + amount,
+                first_order_at=db.func.coalesce(table.c.first_order_at, ordered_at),
+                last_order_at=ordered_at,
+                updated_at=table.c.updated_at  # 订单统计变化不算资料更新
+            )
+        )
+
+    @staticmethod
+    def record_cancellation(user_id, amount):
+        """订单取消后从消费金额中扣除"""
+        table = User.__table__
+        db.session.execute(
+            table.update().where(table.c.id == user_id).values(
+                total_spent=table.c.total_spent - amount,
+                updated_at=table.c.updated_at
+            )
+        )
+
+    @staticmethod
+    def rebuild_order_stats():
+        """根据订单表批量重建所有用户的订单统计，返回有订单的用户数"""
+        from sqlalchemy import func, case
         from models.order import Order
-        total = db.session.query(func.sum(Order.total_price)).filter_by(user_id=self.id).scalar()
-        return float(total) if total else 0.0
+
+        stats = db.session.query(
+            Order.user_id,
+            func.count(Order.id),
+            func.sum(case((Order.status != 'cancelled', Order.total_price), else_=0)),
+            func.min(Order.created_at),
+            func.max(Order.created_at)
+        ).group_by(Order.user_id).all()
+
+        table = User.__table__
+        db.session.execute(table.update().values(
+            order_count=0, total_spent=0, first_order_at=None, last_order_at=None,
+            updated_at=table.c.updated_at
+        ))
+        if stats:
+            db.session.execute(
+                table.update().where(table.c.id == db.bindparam('user_id')).values(
+                    order_count=db.bindparam('new_order_count'),
+                    total_spent=db.bindparam('new_total_spent'),
+                    first_order_at=db.bindparam('new_first_order_at'),
+                    last_order_at=db.bindparam('new_last_order_at'),
+                    updated_at=table.c.updated_at
+                ),
+                [{
+                    'user_id': user_id,
+                    'new_order_count': order_count,
+                    'new_total_spent': total_spent or 0,
+                    'new_first_order_at': first_order_at,
+                    'new_last_order_at': last_order_at
+                } for user_id, order_count, total_spent, first_order_at, last_order_at in stats]
+            )
+        db.session.commit()
+        return len(stats)
 
     def __repr__(self):
         return f'<User {self.username}>'
\ No newline at end of file
@@ -1,6 +1,6 @@
 """认证路由"""
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity, create_refresh_token
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, create_refresh_token
 from services.auth_service import AuthService
 from utils.auth_utils import token_required
 
@@ -17,6 +17,8 @@ def register():
         result = AuthService.register_user(data)
         if result['success']:
             return jsonify(result), 201
+        elif result.get('busy'):
+            return jsonify(result), 503
         else:
             return jsonify(result), 400
 
@@ -34,12 +36,34 @@ def login():
         result = AuthService.login_user(data)
         if result['success']:
             return jsonify(result), 200
+        elif result.get('busy'):
+            return jsonify(result), 503
         else:
             return jsonify(result), 401
 
     except Exception as e:
         return jsonify({'success': False, 'errors': [f'服务器错误: {str(e)}']}), 500
 
+@auth_bp.route('/availability', methods=['GET'])
+def check_availability():
+    """检查用户名、邮箱是否可用（注册表单实时校验）"""
+    try:
+        username = request.args.get('username', '').strip()
+        email = request.args.get('email', '').strip()
+        if not username and not email:
+            return jsonify({'success': False, 'errors': ['请提供用户名或邮箱']}), 400
+
+        result = AuthService.check_availability(username, email)
+        if result['success']:
+            response = jsonify(result)
+            response.headers['Cache-Control'] = 'no-store'
+            return response, 200
+        else:
+            return jsonify(result), 400
+
+    except Exception as e:
+        return jsonify({'success': False, 'errors': [f'服务器错误: {str(e)}']}), 500
+
 @auth_bp.route('/refresh', methods=['POST'])
 @jwt_required(refresh=True)
 def refresh():
@@ -102,6 +126,8 @@ def change_password():
         result = AuthService.change_password(current_user_id, data)
         if result['success']:
             return jsonify(result), 200
+        elif result.get('busy'):
+            return jsonify(result), 503
         else:
             return jsonify(result), 400
 
@@ -113,8 +139,12 @@ def change_password():
 def logout():
     """用户登出"""
     try:
-        result = AuthService.logout_user()
-        return jsonify(result), 200
+        data = request.get_json(silent=True) or {}
+        result = AuthService.logout_user(get_jwt(), data.get('refresh_token'))
+        if result['success']:
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 500
 
     except Exception as e:
         return jsonify({'success': False, 'errors': [f'登出失败: {str(e)}']}), 500
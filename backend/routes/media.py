@@ -0,0 +1,41 @@
+"""媒体文件路由"""
+import os
+from flask import Blueprint, current_app, send_file, abort
+from services.image_pipeline import image_dir, IMAGE_NAME_PATTERN
+
+media_bp = Blueprint('media', __name__)
+
+# 文件名由内容哈希决定，内容不会变化，可以永久缓存
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+@media_bp.route('/menu/<path:filename>', methods=['GET'])
+def get_menu_image(filename):
+    """获取菜单图片（原图或缩略图）
+
+    配置 MEDIA_ACCEL_REDIRECT_PREFIX 时只返回 X-Accel-Redirect 头，由 Nginx 直接发送文件；
+    否则由 send_file 发送，支持 Range 请求和条件请求（USE_X_SENDFILE 开启时使用 X-Sendfile）
+    """
+    # 只接受内容哈希格式的文件名，同时防止路径穿越
+    if not IMAGE_NAME_PATTERN.match(filename):
+        abort(404)
+
+    path = os.path.join(image_dir(), filename)
+    if not os.path.isfile(path):
+        abort(404)
+
+    accel_prefix = current_app.config.get('MEDIA_ACCEL_REDIRECT_PREFIX')
+    if accel_prefix:
+        response = current_app.response_class(
+            mimetype=_guess_mimetype(filename)
+        )
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/menu/{filename}"
+    else:
+        response = send_file(path, conditional=True, etag=True, max_age=31536000)
+
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+def _guess_mimetype(filename):
+    """按扩展名确定图片类型"""
+    extension = filename.rsplit('.', 1)[-1]
+    return {'jpg': 'image/jpeg', 'png': 'image/png', 'gif': 'image/gif', 'webp': 'image/webp'}[extension]
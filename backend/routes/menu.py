@@ -1,7 +1,8 @@
 """菜单路由"""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required
 from services.menu_service import MenuService
+from utils.http_cache import not_modified, cacheable, public_cache_control
 from utils.auth_utils import token_required, admin_required
 
 menu_bp = Blueprint('menu', __name__)
@@ -14,50 +15,33 @@ def get_menu_items():
         available_only = request.args.get('available_only', 'true').lower() == 'true'
         category = request.args.get('category')
         keyword = request.args.get('keyword')
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 20))
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', 20)), 1), 100)
+
+        # 菜单未变化时直接返回 304
+        etag = MenuService.get_menu_etag()
+        cache_control = public_cache_control()
+        cached = not_modified(etag, cache_control)
+        if cached:
+            return cached
 
         # 搜索功能
         if keyword:
-            result = MenuService.search_menu_items(keyword, available_only)
-            # 实现简单分页
-            start = (page - 1) * per_page
-            end = start + per_page
-            paginated_items = result['menu_items'][start:end]
-
-            return jsonify({
-                'success': True,
-                'data': {
-                    'items': paginated_items,
-                    'total': result['total'],
-                    'page': page,
-                    'per_page': per_page,
-                    'pages': (result['total'] + per_page - 1) // per_page
-                }
-            }), 200
-
-        # 获取分类菜单
-        if category:
-            result = MenuService.get_all_menu_items(available_only, category)
+            result = MenuService.search_menu_items(keyword, available_only, page, per_page)
         else:
-            result = MenuService.get_all_menu_items(available_only)
+            result = MenuService.get_all_menu_items(available_only, category, page, per_page)
 
         if result['success']:
-            # 实现简单分页
-            start = (page - 1) * per_page
-            end = start + per_page
-            paginated_items = result['menu_items'][start:end]
-
-            return jsonify({
+            return cacheable((jsonify({
                 'success': True,
                 'data': {
-                    'items': paginated_items,
+                    'items': result['menu_items'],
                     'total': result['total'],
                     'page': page,
                     'per_page': per_page,
                     'pages': (result['total'] + per_page - 1) // per_page
                 }
-            }), 200
+            }), 200), etag, cache_control)
         else:
             return jsonify(result), 400
 
@@ -68,6 +52,12 @@ def get_menu_items():
 def get_categories():
     """获取菜单分类"""
     try:
+        etag = MenuService.get_menu_etag()
+        cache_control = public_cache_control()
+        cached = not_modified(etag, cache_control)
+        if cached:
+            return cached
+
         result = MenuService.get_all_menu_items(available_only=True)
         if result['success']:
             # 提取所有分类
@@ -82,10 +72,10 @@ def get_categories():
             for cat in sorted(categories):
                 category_list.append({'value': cat, 'label': cat.title()})
 
-            return jsonify({
+            return cacheable((jsonify({
                 'success': True,
                 'data': category_list
-            }), 200
+            }), 200), etag, cache_control)
         else:
             return jsonify({
                 'success': True,
@@ -113,15 +103,18 @@ def get_categories():
 def get_popular_items():
     """获取热门商品"""
     try:
-        result = MenuService.get_all_menu_items(available_only=True)
-        if result['success']:
-            # 筛选热门商品
-            popular_items = [item for item in result['menu_items'] if item.get('is_popular', False)]
+        etag = MenuService.get_menu_etag()
+        cache_control = public_cache_control()
+        cached = not_modified(etag, cache_control)
+        if cached:
+            return cached
 
-            return jsonify({
+        result = MenuService.get_popular_items(limit=current_app.config['POPULAR_ITEMS_COUNT'])
+        if result['success']:
+            return cacheable((jsonify({
                 'success': True,
-                'data': popular_items[:6]  # 返回前6个热门商品
-            }), 200
+                'data': result['popular_items']
+            }), 200), etag, cache_control)
         else:
             return jsonify({'success': False, 'errors': ['获取热门商品失败']}), 400
     except Exception as e:
@@ -131,12 +124,18 @@ def get_popular_items():
 def get_menu_item(item_id):
     """获取单个菜单项详情"""
     try:
+        etag = MenuService.get_menu_etag()
+        cache_control = public_cache_control()
+        cached = not_modified(etag, cache_control)
+        if cached:
+            return cached
+
         result = MenuService.get_menu_item_by_id(item_id)
         if result['success']:
-            return jsonify({
+            return cacheable((jsonify({
                 'success': True,
                 'data': result['menu_item']
-            }), 200
+            }), 200), etag, cache_control)
         else:
             return jsonify({
                 'success': False,
@@ -1,8 +1,14 @@
 """订单路由"""
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from services.order_service import OrderService
-from utils.auth_utils import token_required, admin_required, get_current_user, get_current_user_id
+import time
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, verify_jwt_in_request
+from extensions import db
+from services.order_service import OrderService, MAX_BULK_STATUS_ORDERS
+from services.event_bus import get_event_bus
+from services.kitchen_queue import kitchen_queue, ACTIVE_STATUSES
+from services.token_revocation import token_revocation_store
+from utils.http_cache import not_modified, cacheable, PRIVATE_REVALIDATE
+from utils.auth_utils import token_required, admin_required, current_user_is_admin, get_current_user_id
 
 order_bp = Blueprint('order', __name__)
 
@@ -31,7 +37,6 @@ def create_order():
 def get_orders():
     """获取订单列表"""
     try:
-        current_user = get_current_user()
         current_user_id = get_jwt_identity()
 
         # 获取查询参数
@@ -39,11 +44,13 @@ def get_orders():
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 10))
 
+        cursor = request.args.get('cursor')
+
         # 管理员查看所有订单，普通用户只看自己的订单
-        if current_user.is_admin():
-            result = OrderService.get_all_orders(status, page, per_page)
+        if current_user_is_admin():
+            result = OrderService.get_all_orders(status, page, per_page, cursor)
         else:
-            result = OrderService.get_user_orders(current_user_id, status, page, per_page)
+            result = OrderService.get_user_orders(current_user_id, status, page, per_page, cursor)
 
         if result['success']:
             return jsonify(result), 200
@@ -53,20 +60,116 @@ def get_orders():
     except Exception as e:
         return jsonify({'success': False, 'errors': [f'服务器错误: {str(e)}']}), 500
 
+@order_bp.route('/queue', methods=['GET'])
+@admin_required
+def get_kitchen_queue():
+    """获取后厨订单队列（管理员）
+
+    返回待处理、制作中、待取餐的订单及订单项，数据来自内存队列，不查询数据库
+    """
+    try:
+        status = request.args.get('status')
+        if status and status not in ACTIVE_STATUSES:
+            return jsonify({'success': False, 'errors': ['无效的订单状态']}), 400
+
+        orders = kitchen_queue.get_orders()
+        counts = {active_status: 0 for active_status in ACTIVE_STATUSES}
+        for order_data in orders:
+            counts[order_data['status']] += 1
+
+        if status:
+            orders = [order_data for order_data in orders if order_data['status'] == status]
+
+        return jsonify({
+            'success': True,
+            'orders': orders,
+            'counts': counts
+        }), 200
+
+    except Exception as e:
+        return jsonify({'success': False, 'errors': [f'服务器错误: {str(e)}']}), 500
+
+@order_bp.route('/stream', methods=['GET'])
+def order_stream():
+    """订单事件流（Server-Sent Events）
+
+    推送订单创建和状态变更事件：管理员接收全部事件，普通用户只接收自己的订单。
+    EventSource 无法设置请求头，Token 也可以通过查询参数 ?jwt= 传递。
+    每次心跳时重新检查 Token 是否过期或被吊销，连接最长保持 ORDER_STREAM_MAX_AGE 秒，
+    之后由客户端重连并重新认证
+    """
+    try:
+        verify_jwt_in_request(locations=['headers', 'query_string'])
+        jwt_payload = get_jwt()
+        current_user_id = get_jwt_identity()
+        is_admin = current_user_is_admin()
+    except Exception as e:
+        return jsonify({'message': 'Token验证失败', 'error': str(e)}), 401
+    finally:
+        # 认证可能用到数据库会话，stream_with_context 会让会话随连接一直存活，
+        # 这里提前归还连接，避免每个打开的事件流占用一个连接池连接
+        db.session.remove()
+
+    config = current_app.config
+    heartbeat = config.get('ORDER_STREAM_HEARTBEAT', 15)
+    deadline = min(time.time() + config.get('ORDER_STREAM_MAX_AGE', 3600), jwt_payload.get('exp', float('inf')))
+    subscription = get_event_bus().subscribe()
+
+    def token_still_valid():
+        try:
+            return time.time() < deadline and not token_revocation_store.is_revoked(jwt_payload)
+        finally:
+            db.session.remove()
+
+    def generate():
+        try:
+            # 告知客户端断线重连间隔
+            yield 'retry: 3000\n\n'
+            while True:
+                event = subscription.get(timeout=heartbeat)
+                if event is None:
+                    if not token_still_valid():
+                        # Token 过期、被吊销或连接到达最长时间，结束事件流
+                        break
+                    yield ': keepalive\n\n'
+                    continue
+                if time.time() >= deadline:
+                    break
+                if not is_admin and str(event['user_id']) != str(current_user_id):
+                    continue
+                data = current_app.json.dumps(event['order'], ensure_ascii=False)
+                yield f"event: {event['type']}\ndata: {data}\n\n"
+        finally:
+            subscription.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # 关闭 Nginx 缓冲
+        }
+    )
+
 @order_bp.route('/<int:order_id>', methods=['GET'])
 @token_required
 def get_order(order_id):
     """获取订单详情"""
     try:
-        current_user = get_current_user()
         current_user_id = get_jwt_identity()
+        is_admin = current_user_is_admin()
 
-        result = OrderService.get_order_by_id(
-            order_id, current_user_id, current_user.is_admin()
-        )
+        # 订单未变化时直接返回 304，不再加载和序列化订单
+        etag = OrderService.get_order_etag(order_id, current_user_id, is_admin)
+        if etag:
+            cached = not_modified(etag, PRIVATE_REVALIDATE, vary='Authorization')
+            if cached:
+                return cached
+
+        result = OrderService.get_order_by_id(order_id, current_user_id, is_admin)
 
         if result['success']:
-            return jsonify(result), 200
+            return cacheable((jsonify(result), 200), etag, PRIVATE_REVALIDATE, vary='Authorization')
         else:
             return jsonify(result), 404
 
@@ -98,16 +201,47 @@ def update_order_status(order_id):
     except Exception as e:
         return jsonify({'success': False, 'errors': [f'服务器错误: {str(e)}']}), 500
 
+@order_bp.route('/status', methods=['PUT'])
+@admin_required
+def bulk_update_order_status():
+    """批量更新订单状态（仅管理员）"""
+    try:
+        data = request.get_json()
+        if not data or 'status' not in data or not data.get('order_ids'):
+            return jsonify({'success': False, 'errors': ['请提供订单ID列表和订单状态']}), 400
+
+        new_status = data['status']
+        valid_statuses = ['pending', 'preparing', 'ready', 'completed', 'cancelled']
+
+        if new_status not in valid_statuses:
+            return jsonify({'success': False, 'errors': ['无效的订单状态']}), 400
+
+        order_ids = data['order_ids']
+        if not isinstance(order_ids, list):
+            return jsonify({'success': False, 'errors': ['订单ID列表格式错误']}), 400
+
+        if len(order_ids) > MAX_BULK_STATUS_ORDERS:
+            return jsonify({'success': False, 'errors': [f'每次最多更新 {MAX_BULK_STATUS_ORDERS} 个订单']}), 400
+
+        result = OrderService.bulk_update_order_status(order_ids, new_status)
+
+        if result['success']:
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 400
+
+    except Exception as e:
+        return jsonify({'success': False, 'errors': [f'服务器错误: {str(e)}']}), 500
+
 @order_bp.route('/<int:order_id>/cancel', methods=['PUT'])
 @token_required
 def cancel_order(order_id):
     """取消订单"""
     try:
-        current_user = get_current_user()
         current_user_id = get_jwt_identity()
 
         result = OrderService.cancel_order(
-            order_id, current_user_id, current_user.is_admin()
+            order_id, current_user_id, current_user_is_admin()
         )
 
         if result['success']:
@@ -129,11 +263,17 @@ def get_my_orders():
         status = request.args.get('status')
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 10))
+        cursor = request.args.get('cursor')
+
+        etag = OrderService.get_user_orders_etag(current_user_id, status)
+        cached = not_modified(etag, PRIVATE_REVALIDATE, vary='Authorization')
+        if cached:
+            return cached
 
-        result = OrderService.get_user_orders(current_user_id, status, page, per_page)
+        result = OrderService.get_user_orders(current_user_id, status, page, per_page, cursor)
 
         if result['success']:
-            return jsonify(result), 200
+            return cacheable((jsonify(result), 200), etag, PRIVATE_REVALIDATE, vary='Authorization')
         else:
             return jsonify(result), 400
 
@@ -197,34 +337,12 @@ def get_daily_sales():
 def get_order_count():
     """获取订单总数（仅管理员）"""
     try:
-        from models.order import Order
-        from extensions import db
-
-        # 总订单数
-        total_orders = Order.query.count()
-
-        # 待处理订单数
-        pending_orders = Order.query.filter_by(status='pending').count()
+        result = OrderService.get_order_counts()
 
-        # 准备中订单数
-        preparing_orders = Order.query.filter_by(status='preparing').count()
-
-        # 今日订单数
-        from datetime import date
-        today = date.today()
-        today_orders = Order.query.filter(
-            db.func.date(Order.created_at) == today
-        ).count()
-
-        return jsonify({
-            'success': True,
-            'counts': {
-                'total_orders': total_orders,
-                'pending_orders': pending_orders,
-                'preparing_orders': preparing_orders,
-                'today_orders': today_orders
-            }
-        }), 200
+        if result['success']:
+            return jsonify(result), 200
+        else:
+            return jsonify(result), 400
 
     except Exception as e:
         return jsonify({'success': False, 'errors': [f'服务器错误: {str(e)}']}), 500
@@ -234,20 +352,16 @@ def get_order_count():
 def get_recent_orders():
     """获取最近订单（仅管理员）"""
     try:
+        from models.order import Order
+        from sqlalchemy.orm import joinedload
+
         limit = int(request.args.get('limit', 10))
 
-        recent_orders = Order.query.order_by(
+        recent_orders = Order.query.options(joinedload(Order.user)).order_by(
             Order.created_at.desc()
         ).limit(limit).all()
 
-        orders = []
-        for order in recent_orders:
-            order_data = order.to_dict(include_items=True)
-            order_data['user'] = {
-                'id': order.user.id,
-                'username': order.user.username
-            }
-            orders.append(order_data)
+        orders = OrderService.serialize_orders(recent_orders, user_fields=('id', 'username'))
 
         return jsonify({
             'success': True,
@@ -262,7 +376,6 @@ def get_recent_orders():
 def get_orders_by_status(status):
     """根据状态获取订单"""
     try:
-        current_user = get_current_user()
         current_user_id = get_jwt_identity()
 
         # 验证状态
@@ -273,11 +386,12 @@ def get_orders_by_status(status):
         # 获取分页参数
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 10))
+        cursor = request.args.get('cursor')
 
-        if current_user.is_admin():
-            result = OrderService.get_all_orders(status, page, per_page)
+        if current_user_is_admin():
+            result = OrderService.get_all_orders(status, page, per_page, cursor)
         else:
-            result = OrderService.get_user_orders(current_user_id, status, page, per_page)
+            result = OrderService.get_user_orders(current_user_id, status, page, per_page, cursor)
 
         if result['success']:
             return jsonify(result), 200
@@ -298,33 +412,43 @@ def search_orders():
 
         # 获取分页参数
         page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
+        per_page = OrderService.clamp_per_page(request.args.get('per_page', 10))
 
-        # 搜索订单号或用户名
+        # 按关键词形式选择走索引的搜索方式（订单号前缀、今日流水号、邮箱/用户名精确、部分匹配）
         from models.order import Order
-        from models.user import User
-        from extensions import db
-
-        query = Order.query.join(User).filter(
-            db.or_(
-                Order.order_number.like(f'%{keyword}%'),
-                User.username.like(f'%{keyword}%'),
-                User.email.like(f'%{keyword}%')
-            )
-        ).order_by(Order.created_at.desc())
+        from services.order_search import OrderSearchService
+        from sqlalchemy.orm import joinedload
+
+        search_mode, condition = OrderSearchService.build_filter(keyword)
+        query = Order.query.options(joinedload(Order.user)).filter(condition)
+
+        # 游标分页：不统计总数
+        cursor = request.args.get('cursor')
+        if cursor is not None:
+            try:
+                page_orders, next_cursor = OrderService.paginate_by_cursor(query, cursor, per_page)
+            except ValueError as e:
+                return jsonify({'success': False, 'errors': [str(e)]}), 400
+
+            return jsonify({
+                'success': True,
+                'orders': OrderService.serialize_orders(
+                    page_orders, user_fields=('id', 'username', 'email')
+                ),
+                'per_page': per_page,
+                'next_cursor': next_cursor,
+                'keyword': keyword,
+                'search_mode': search_mode
+            }), 200
 
         # 分页
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-
-        orders = []
-        for order in pagination.items:
-            order_data = order.to_dict(include_items=True)
-            order_data['user'] = {
-                'id': order.user.id,
-                'username': order.user.username,
-                'email': order.user.email
-            }
-            orders.append(order_data)
+        pagination = query.order_by(Order.created_at.desc()).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+
+        orders = OrderService.serialize_orders(
+            pagination.items, user_fields=('id', 'username', 'email')
+        )
 
         return jsonify({
             'success': True,
@@ -333,7 +457,8 @@ def search_orders():
             'page': page,
             'per_page': per_page,
             'pages': pagination.pages,
-            'keyword': keyword
+            'keyword': keyword,
+            'search_mode': search_mode
         }), 200
 
     except Exception as e:
@@ -3,7 +3,12 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import User
 from extensions import db
-from utils.auth_utils import admin_required, token_required
+from sqlalchemy.exc import IntegrityError
+from utils.auth_utils import admin_required, token_required, mark_role_changed, find_taken_fields, duplicate_user_error
+from utils.password_hasher import PasswordHasherBusy
+from services.order_search import user_ngram_index, escape_like
+from services.user_availability import user_availability_index
+from services.token_revocation import token_revocation_store
 
 user_bp = Blueprint('user', __name__)
 
@@ -26,11 +31,11 @@ def get_users():
 
         # 关键词搜索
         if keyword:
-            search_pattern = f'%{keyword}%'
+            search_pattern = f'%{escape_like(keyword)}%'
             query = query.filter(
                 db.or_(
-                    User.username.like(search_pattern),
-                    User.email.like(search_pattern)
+                    User.username.like(search_pattern, escape='\\'),
+                    User.email.like(search_pattern, escape='\\')
                 )
             )
 
@@ -39,13 +44,8 @@ def get_users():
             page=page, per_page=per_page, error_out=False
         )
 
-        users = []
-        for user in pagination.items:
-            user_data = user.to_dict()
-            # 添加额外统计信息
-            user_data['order_count'] = user.get_order_count()
-            user_data['total_spent'] = user.get_total_spent()
-            users.append(user_data)
+        # 订单统计直接读取用户表上维护的字段
+        users = [user.to_dict(include_stats=True) for user in pagination.items]
 
         return jsonify({
             'success': True,
@@ -68,9 +68,7 @@ def get_user(user_id):
         if not user:
             return jsonify({'success': False, 'errors': ['用户不存在']}), 404
 
-        user_data = user.to_dict()
-        user_data['order_count'] = user.get_order_count()
-        user_data['total_spent'] = user.get_total_spent()
+        user_data = user.to_dict(include_stats=True)
 
         return jsonify({
             'success': True,
@@ -95,6 +93,8 @@ def update_user(user_id):
 
         # 验证数据
         errors = []
+        check_email = None
+        check_username = None
         if 'email' in data:
             email = data.get('email', '').strip()
             if not email:
@@ -104,16 +104,22 @@ def update_user(user_id):
                 import re
                 if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
                     errors.append('邮箱格式不正确')
-                # 检查邮箱是否已被使用
-                elif email != user.email and User.query.filter_by(email=email).first():
-                    errors.append('邮箱已被使用')
+                elif email != user.email:
+                    check_email = email
 
         if 'username' in data:
             username = data.get('username', '').strip()
             if not username or len(username) < 3:
                 errors.append('用户名至少3个字符')
-            elif username != user.username and User.query.filter_by(username=username).first():
-                errors.append('用户名已被使用')
+            elif username != user.username:
+                check_username = username
+
+        # 检查用户名、邮箱是否已被使用（一次查询）
+        taken = find_taken_fields(username=check_username, email=check_email, exclude_user_id=user.id)
+        if 'email' in taken:
+            errors.append('邮箱已被使用')
+        if 'username' in taken:
+            errors.append('用户名已被使用')
 
         if 'role' in data:
             role = data.get('role')
@@ -131,12 +137,22 @@ def update_user(user_id):
             return jsonify({'success': False, 'errors': errors}), 400
 
         # 更新用户信息
+        role_changed = 'role' in data and data['role'] != user.role
+        old_username, old_email = user.username, user.email
         allowed_fields = ['username', 'email', 'phone', 'role']
         for field in allowed_fields:
             if field in data:
                 setattr(user, field, data[field])
 
         db.session.commit()
+        user_ngram_index.add(user)
+        user_availability_index.discard(old_username, old_email)
+        user_availability_index.add(user)
+
+        # 角色变更后旧Token中的角色声明失效，并吊销该用户已签发的Token
+        if role_changed:
+            mark_role_changed(user.id)
+            token_revocation_store.revoke_user_tokens(user.id)
 
         return jsonify({
             'success': True,
@@ -144,6 +160,10 @@ def update_user(user_id):
             'user': user.to_dict()
         }), 200
 
+    except IntegrityError as e:
+        # 检查之后被并发占用
+        db.session.rollback()
+        return jsonify({'success': False, 'errors': [duplicate_user_error(e)]}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'errors': [f'更新失败: {str(e)}']}), 500
@@ -161,8 +181,12 @@ def delete_user(user_id):
         if user.orders.count() > 0:
             return jsonify({'success': False, 'errors': ['该用户有关联订单，无法删除']}), 400
 
+        username, email = user.username, user.email
         db.session.delete(user)
         db.session.commit()
+        mark_role_changed(user_id)
+        token_revocation_store.revoke_user_tokens(user_id)
+        user_availability_index.discard(username, email)
 
         return jsonify({
             'success': True,
@@ -198,6 +222,9 @@ def reset_user_password(user_id):
             'message': '密码重置成功'
         }), 200
 
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'errors': [str(e)], 'busy': True}), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'errors': [f'重置密码失败: {str(e)}']}), 500
@@ -229,7 +256,7 @@ def get_user_statistics():
         ).count()
 
         # 活跃用户（有订单记录的用户）
-        active_users = db.session.query(User.id).join(User.orders).distinct().count()
+        active_users = User.query.filter(User.order_count > 0).count()
 
         return jsonify({
             'success': True,
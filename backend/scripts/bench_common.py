@@ -0,0 +1,35 @@
+"""压测脚本公共函数"""
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def create_bench_app(config_name='testing'):
+    """创建使用临时 SQLite 文件数据库的应用并建表，返回 (app, 数据库文件路径)
+
+    设置了 TEST_DATABASE_URL 时使用该数据库
+    """
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ.setdefault('TEST_DATABASE_URL', f'sqlite:///{db_path}')
+
+    from app import create_app
+    from extensions import db
+
+    app = create_app(config_name)
+    with app.app_context():
+        db.create_all()
+    return app, db_path
+
+
+def measure(func, repeat=100, warmup=3):
+    """执行 func 若干次，返回每次的平均耗时（毫秒）"""
+    for _ in range(warmup):
+        func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
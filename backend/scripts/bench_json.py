@@ -0,0 +1,64 @@
+"""JSON 编码与响应压缩压测：管理员订单列表（默认 100 个订单 × 3 个订单项）
+
+    python scripts/bench_json.py --orders 100
+"""
+import argparse
+import gzip
+from bench_common import create_bench_app, measure
+
+
+def seed(order_count):
+    from extensions import db
+    from models import MenuItem, Order, OrderItem, User
+
+    user = User('bench', 'bench@example.com', 'secret1')
+    db.session.add(user)
+    db.session.add_all([MenuItem(f'拿铁{i}', 10 + i, description='浓缩咖啡与牛奶', category='coffee') for i in range(5)])
+    db.session.flush()
+    for index in range(order_count):
+        order = Order(user.id, f'BENCH{index:06d}', 36, customer_name='张三', notes='少冰')
+        db.session.add(order)
+        db.session.flush()
+        for menu_id in (1, 2, 3):
+            db.session.add(OrderItem(order.id, menu_id, 1, 12))
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=100, help='订单数量')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    app, _ = create_bench_app()
+    with app.app_context():
+        from services.order_service import OrderService
+        from utils.json_provider import StdlibJSONProvider, OrjsonProvider, orjson
+        from utils.compression import brotli
+
+        seed(args.orders)
+        payload = OrderService.get_all_orders(per_page=args.orders)
+
+        stdlib = StdlibJSONProvider(app)
+        body = stdlib.dumps(payload).encode('utf-8')
+        print(f'{args.orders} 个订单，响应体 {len(body) / 1024:.1f} KB')
+        print(f'标准库编码: {measure(lambda: stdlib.dumps(payload), args.repeat):.3f} ms')
+        if orjson is not None:
+            fast = OrjsonProvider(app)
+            print(f'orjson 编码: {measure(lambda: fast.dumps(payload), args.repeat):.3f} ms')
+        else:
+            print('orjson 未安装，跳过')
+
+        level = app.config.get('GZIP_LEVEL', 6)
+        gzip_ms = measure(lambda: gzip.compress(body, compresslevel=level), args.repeat)
+        print(f'gzip {level}: {len(gzip.compress(body, compresslevel=level)) / 1024:.1f} KB，{gzip_ms:.3f} ms')
+        if brotli is not None:
+            quality = app.config.get('BROTLI_QUALITY', 4)
+            br_ms = measure(lambda: brotli.compress(body, quality=quality), args.repeat)
+            print(f'brotli {quality}: {len(brotli.compress(body, quality=quality)) / 1024:.1f} KB，{br_ms:.3f} ms')
+        else:
+            print('brotli 未安装，跳过')
+
+
+if __name__ == '__main__':
+    main()
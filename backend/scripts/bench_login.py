@@ -0,0 +1,77 @@
+"""登录压测：不同 bcrypt cost 下的登录吞吐量，以及登录高峰时其它接口的延迟
+
+    python scripts/bench_login.py --cost 12 --threads 8 --logins 40
+"""
+import argparse
+import threading
+import time
+from bench_common import create_bench_app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cost', type=int, default=12, help='BCRYPT_LOG_ROUNDS')
+    parser.add_argument('--threads', type=int, default=8, help='并发登录线程数')
+    parser.add_argument('--logins', type=int, default=40, help='登录总次数')
+    args = parser.parse_args()
+
+    app, _ = create_bench_app()
+    app.config['BCRYPT_LOG_ROUNDS'] = args.cost
+    with app.app_context():
+        from extensions import db
+        from models import User
+
+        db.session.add(User('bench', 'bench@example.com', 'secret1'))
+        db.session.commit()
+
+    statuses = []
+    remaining = [args.logins]
+    lock = threading.Lock()
+
+    def login_worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            response = client.post('/api/auth/login', json={'username': 'bench', 'password': 'secret1'})
+            with lock:
+                statuses.append(response.status_code)
+
+    # 登录进行期间持续请求健康检查接口，观察其它接口是否仍能及时响应
+    probe_latencies = []
+    done = threading.Event()
+
+    def probe_worker():
+        client = app.test_client()
+        while not done.is_set():
+            started = time.perf_counter()
+            client.get('/api/health')
+            probe_latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.05)
+
+    probe = threading.Thread(target=probe_worker)
+    threads = [threading.Thread(target=login_worker) for _ in range(args.threads)]
+    probe.start()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    probe.join()
+
+    ok = statuses.count(200)
+    busy = statuses.count(503)
+    probe_latencies.sort()
+    print(f'cost {args.cost}，{args.threads} 线程，哈希线程 {app.config.get("PASSWORD_HASH_WORKERS")}：'
+          f'{ok} 次成功，{busy} 次繁忙（503），耗时 {elapsed:.2f}s，{ok / elapsed:.1f} 次登录/秒')
+    if probe_latencies:
+        p95 = probe_latencies[min(int(len(probe_latencies) * 0.95), len(probe_latencies) - 1)]
+        print(f'登录期间 /api/health 延迟：p50 {probe_latencies[len(probe_latencies) // 2]:.1f} ms，p95 {p95:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
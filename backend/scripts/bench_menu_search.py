@@ -0,0 +1,80 @@
+"""菜单搜索压测：倒排索引与 LIKE 全表扫描对比
+
+    python scripts/bench_menu_search.py --items 10000
+"""
+import argparse
+import time
+from bench_common import create_bench_app, measure
+
+NAMES = ['拿铁', '美式', '卡布奇诺', '摩卡', '焦糖玛奇朵', '馥芮白', '抹茶拿铁', '冷萃', '燕麦拿铁', '香草拿铁']
+CATEGORIES = ['coffee', 'tea', 'dessert', 'snack']
+KEYWORDS = ['拿铁', '卡布', '奇诺', 'latte', 'natie', '焦糖']
+PER_PAGE = 20
+
+
+def seed(count):
+    from extensions import db
+    from models import MenuItem
+
+    db.session.add_all([
+        MenuItem(
+            f'{NAMES[i % len(NAMES)]} {i}',
+            10 + i % 30,
+            description=f'{NAMES[(i * 7) % len(NAMES)]}风味 latte blend #{i}',
+            category=CATEGORIES[i % len(CATEGORIES)]
+        )
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def like_search(keyword):
+    """改造前的查询方式：三列 LIKE '%关键词%'，COUNT 总数并取第一页"""
+    from models import MenuItem
+
+    pattern = f'%{keyword}%'
+    query = MenuItem.query.filter_by(is_available=True).filter(
+        MenuItem.name.like(pattern) | MenuItem.description.like(pattern) | MenuItem.category.like(pattern)
+    )
+    total = query.count()
+    items = [item.to_dict() for item in query.order_by(MenuItem.category, MenuItem.name).limit(PER_PAGE)]
+    return total, items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=10000, help='菜单项数量')
+    parser.add_argument('--repeat', type=int, default=20, help='每个关键词的重复次数')
+    args = parser.parse_args()
+
+    app, _ = create_bench_app()
+    with app.app_context():
+        from services.menu_catalog import menu_catalog
+        from services.menu_service import MenuService
+
+        seed(args.items)
+
+        started = time.perf_counter()
+        menu_catalog.invalidate()
+        MenuService.search_menu_items(KEYWORDS[0], True, 1, PER_PAGE)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        def run_like():
+            for keyword in KEYWORDS:
+                like_search(keyword)
+
+        def run_index():
+            for keyword in KEYWORDS:
+                MenuService.search_menu_items(keyword, True, 1, PER_PAGE)
+
+        like_ms = measure(run_like, args.repeat) / len(KEYWORDS)
+        index_ms = measure(run_index, args.repeat) / len(KEYWORDS)
+
+        print(f'{args.items} 个菜单项，关键词 {KEYWORDS}，第一页 {PER_PAGE} 条并统计总数')
+        print(f'LIKE + COUNT: {like_ms:.2f} ms/次')
+        print(f'倒排索引:     {index_ms:.2f} ms/次')
+        print(f'索引构建（含加载菜单目录）: {build_ms:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
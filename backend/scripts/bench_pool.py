@@ -0,0 +1,72 @@
+"""连接池压测：并发请求数超过连接池容量时观察获取连接的等待时间
+
+    python scripts/bench_pool.py --threads 30 --pool-size 5 --max-overflow 5
+    DATABASE_URL=mysql+pymysql://... python scripts/bench_pool.py
+
+未设置 DATABASE_URL 时使用临时 SQLite 文件（同样使用 QueuePool）
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=30, help='并发线程数')
+    parser.add_argument('--requests', type=int, default=20, help='每个线程的请求数')
+    parser.add_argument('--hold-ms', type=float, default=20, help='每个请求持有连接的时间（毫秒）')
+    parser.add_argument('--pool-size', type=int, default=5)
+    parser.add_argument('--max-overflow', type=int, default=5)
+    parser.add_argument('--pool-timeout', type=int, default=10)
+    args = parser.parse_args()
+
+    if not os.environ.get('DATABASE_URL'):
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_pool.db')}"
+    os.environ['DB_POOL_SIZE'] = str(args.pool_size)
+    os.environ['DB_MAX_OVERFLOW'] = str(args.max_overflow)
+    os.environ['DB_POOL_TIMEOUT'] = str(args.pool_timeout)
+
+    from sqlalchemy import text
+    from app import create_app
+    from extensions import db
+    from utils.db_metrics import pool_metrics
+
+    app = create_app('production')
+    errors = []
+
+    def worker():
+        for _ in range(args.requests):
+            with app.app_context():
+                try:
+                    db.session.execute(text('SELECT 1'))
+                    time.sleep(args.hold_ms / 1000)
+                except Exception as e:
+                    errors.append(type(e).__name__)
+                finally:
+                    db.session.remove()
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        snapshot = pool_metrics.snapshot(db.engine)
+
+    total = args.threads * args.requests
+    print(f'{total} 个请求，{args.threads} 线程，连接池 {args.pool_size}+{args.max_overflow}，'
+          f'耗时 {elapsed:.2f}s（{total / elapsed:.0f} 请求/秒），失败 {len(errors)}')
+    print(json.dumps(snapshot, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,30 @@
 """认证服务"""
 from models.user import User
 from extensions import db
-from utils.auth_utils import validate_registration_data, validate_login_data, user_exists
-from flask_jwt_extended import create_access_token, create_refresh_token
+from utils.auth_utils import (
+    validate_registration_data, validate_login_data, find_taken_fields, duplicate_user_field, duplicate_user_error
+)
+from utils.password_hasher import PasswordHasherBusy
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
+from services.order_search import user_ngram_index
+from services.user_availability import user_availability_index
+from services.token_revocation import token_revocation_store
+from sqlalchemy.exc import IntegrityError
 import re
 
 class AuthService:
     """认证服务类"""
 
+    @staticmethod
+    def create_access_token(user):
+        """签发访问Token，角色作为声明写入，权限校验无需查询数据库"""
+        return create_access_token(identity=user.id, additional_claims={'role': user.role})
+
+    @staticmethod
+    def create_tokens(user):
+        """签发访问Token和刷新Token"""
+        return AuthService.create_access_token(user), create_refresh_token(identity=user.id)
+
     @staticmethod
     def register_user(user_data):
         """用户注册"""
@@ -21,12 +38,13 @@ class AuthService:
         password = user_data.get('password')
         phone = user_data.get('phone')
 
-        # 检查用户是否已存在
-        if user_exists(username=username):
-            return {'success': False, 'errors': ['用户名已存在']}
-
-        if user_exists(email=email):
-            return {'success': False, 'errors': ['邮箱已存在']}
+        # 内存索引显示已占用时用一次查询确认（索引可能滞后），避免白白计算密码哈希；
+        # 否则直接插入，由唯一约束兜底
+        if (user_availability_index.is_username_taken(username)
+                or user_availability_index.is_email_taken(email)):
+            error = AuthService._duplicate_error(find_taken_fields(username=username, email=email))
+            if error:
+                return {'success': False, 'errors': [error]}
 
         try:
             # 创建新用户
@@ -40,10 +58,11 @@ class AuthService:
 
             db.session.add(new_user)
             db.session.commit()
+            user_ngram_index.add(new_user)
+            user_availability_index.add(new_user)
 
             # 生成Token
-            access_token = create_access_token(identity=new_user.id)
-            refresh_token = create_refresh_token(identity=new_user.id)
+            access_token, refresh_token = AuthService.create_tokens(new_user)
 
             return {
                 'success': True,
@@ -53,10 +72,43 @@ class AuthService:
                 'refresh_token': refresh_token
             }
 
+        except IntegrityError as e:
+            db.session.rollback()
+            field = duplicate_user_field(e)
+            taken = {field} if field else find_taken_fields(username=username, email=email)
+            error = AuthService._duplicate_error(taken)
+            return {'success': False, 'errors': [error or f'注册失败: {str(e.orig)}']}
+        except PasswordHasherBusy as e:
+            db.session.rollback()
+            return {'success': False, 'errors': [str(e)], 'busy': True}
         except Exception as e:
             db.session.rollback()
             return {'success': False, 'errors': [f'注册失败: {str(e)}']}
 
+    @staticmethod
+    def _duplicate_error(taken_fields):
+        """注册时用户名、邮箱冲突的错误信息（用户名优先）"""
+        if 'username' in taken_fields:
+            return '用户名已存在'
+        if 'email' in taken_fields:
+            return '邮箱已存在'
+        return None
+
+    @staticmethod
+    def check_availability(username=None, email=None):
+        """检查用户名、邮箱是否可用（注册表单实时校验，只查内存索引）"""
+        try:
+            data = {}
+            if username:
+                data['username'] = not user_availability_index.is_username_taken(username)
+            if email:
+                data['email'] = not user_availability_index.is_email_taken(email)
+
+            return {'success': True, 'data': data}
+
+        except Exception as e:
+            return {'success': False, 'errors': [f'检查失败: {str(e)}']}
+
     @staticmethod
     def login_user(login_data):
         """用户登录"""
@@ -82,9 +134,16 @@ class AuthService:
             if not user.check_password(password):
                 return {'success': False, 'errors': ['密码错误']}
 
+            # 配置的 cost 变化后，登录时用明文密码重新哈希
+            if user.password_needs_rehash():
+                try:
+                    user.set_password(password)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+
             # 生成Token
-            access_token = create_access_token(identity=user.id)
-            refresh_token = create_refresh_token(identity=user.id)
+            access_token, refresh_token = AuthService.create_tokens(user)
 
             return {
                 'success': True,
@@ -94,6 +153,8 @@ class AuthService:
                 'refresh_token': refresh_token
             }
 
+        except PasswordHasherBusy as e:
+            return {'success': False, 'errors': [str(e)], 'busy': True}
         except Exception as e:
             return {'success': False, 'errors': [f'登录失败: {str(e)}']}
 
@@ -105,7 +166,8 @@ class AuthService:
             if not user:
                 return {'success': False, 'errors': ['用户不存在']}
 
-            access_token = create_access_token(identity=user.id)
+            # 刷新时按数据库中的当前角色重新签发
+            access_token = AuthService.create_access_token(user)
 
             return {
                 'success': True,
@@ -124,10 +186,8 @@ class AuthService:
             if not user:
                 return {'success': False, 'errors': ['用户不存在']}
 
-            # 添加额外信息
-            user_data = user.to_dict()
-            user_data['order_count'] = user.get_order_count()
-            user_data['total_spent'] = user.get_total_spent()
+            # 添加订单统计信息
+            user_data = user.to_dict(include_stats=True)
 
             return {
                 'success': True,
@@ -147,32 +207,45 @@ class AuthService:
 
             # 验证数据
             errors = []
+            check_email = None
+            check_username = None
             if 'email' in profile_data:
                 email = profile_data.get('email')
                 if not email:
                     errors.append('邮箱不能为空')
                 elif not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
                     errors.append('邮箱格式不正确')
-                elif email != user.email and user_exists(email=email):
-                    errors.append('邮箱已被使用')
+                elif email != user.email:
+                    check_email = email
 
             if 'username' in profile_data:
                 username = profile_data.get('username')
                 if not username or len(username) < 3:
                     errors.append('用户名至少3个字符')
-                elif username != user.username and user_exists(username=username):
-                    errors.append('用户名已被使用')
+                elif username != user.username:
+                    check_username = username
+
+            # 用户名、邮箱是否被占用合并为一次查询
+            taken = find_taken_fields(username=check_username, email=check_email, exclude_user_id=user.id)
+            if 'email' in taken:
+                errors.append('邮箱已被使用')
+            if 'username' in taken:
+                errors.append('用户名已被使用')
 
             if errors:
                 return {'success': False, 'errors': errors}
 
             # 更新信息
+            old_username, old_email = user.username, user.email
             allowed_fields = ['username', 'email', 'phone']
             for field in allowed_fields:
                 if field in profile_data:
                     setattr(user, field, profile_data[field])
 
             db.session.commit()
+            user_ngram_index.add(user)
+            user_availability_index.discard(old_username, old_email)
+            user_availability_index.add(user)
 
             return {
                 'success': True,
@@ -180,6 +253,10 @@ class AuthService:
                 'user': user.to_dict()
             }
 
+        except IntegrityError as e:
+            # 检查之后被并发占用
+            db.session.rollback()
+            return {'success': False, 'errors': [duplicate_user_error(e)]}
         except Exception as e:
             db.session.rollback()
             return {'success': False, 'errors': [f'更新失败: {str(e)}']}
@@ -214,13 +291,31 @@ class AuthService:
                 'message': '密码修改成功'
             }
 
+        except PasswordHasherBusy as e:
+            db.session.rollback()
+            return {'success': False, 'errors': [str(e)], 'busy': True}
         except Exception as e:
             db.session.rollback()
             return {'success': False, 'errors': [f'密码修改失败: {str(e)}']}
 
     @staticmethod
-    def logout_user():
-        """用户登出"""
-        # 在JWT中，服务端不需要存储token，登出主要在客户端处理
-        # 可以在这里添加黑名单机制等
-        return {'success': True, 'message': '登出成功'}
\ No newline at end of file
+    def logout_user(jwt_payload, refresh_token=None):
+        """用户登出：吊销当前访问Token，提供刷新Token时一并吊销"""
+        try:
+            token_revocation_store.revoke_token(jwt_payload)
+
+            if refresh_token:
+                try:
+                    refresh_payload = decode_token(refresh_token)
+                except Exception:
+                    refresh_payload = None
+                # 只吊销属于当前用户的刷新Token
+                if (refresh_payload and refresh_payload.get('type') == 'refresh'
+                        and str(refresh_payload.get('sub')) == str(jwt_payload.get('sub'))):
+                    token_revocation_store.revoke_token(refresh_payload)
+
+            return {'success': True, 'message': '登出成功'}
+
+        except Exception as e:
+            db.session.rollback()
+            return {'success': False, 'errors': [f'登出失败: {str(e)}']}
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""订单事件总线"""
+import queue
+import threading
+
+
+class Subscription:
+    """事件订阅，事件通过有界队列投递给订阅者"""
+
+    def __init__(self, bus, maxsize):
+        self._bus = bus
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def get(self, timeout=None):
+        """等待下一条事件，超时返回None"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """取消订阅"""
+        self._bus.unsubscribe(self)
+
+
+class LocalEventBus:
+    """进程内事件总线
+
+    发布事件时投递到本进程所有订阅者的队列，订阅者消费过慢、队列满时丢弃该事件。
+    多进程部署时各 worker 只能收到本进程发布的事件，需要跨进程推送时可替换为
+    实现了相同 publish/subscribe 接口的外部总线（见 init_event_bus）
+    """
+
+    def __init__(self, queue_size=100):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self.queue_size = queue_size
+
+    def subscribe(self):
+        """创建订阅"""
+        subscription = Subscription(self, self.queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """取消订阅"""
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        """发布事件"""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+
+        for subscription in subscriptions:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                subscription.dropped += 1
+
+    def stats(self):
+        """订阅统计"""
+        with self._lock:
+            return {'backend': 'local', 'subscribers': len(self._subscriptions)}
+
+
+# 可用的事件总线实现
+EVENT_BUS_BACKENDS = {
+    'local': LocalEventBus
+}
+
+# 全局事件总线实例
+event_bus = LocalEventBus()
+
+
+def init_event_bus(app):
+    """按配置初始化事件总线"""
+    global event_bus
+
+    backend = app.config.get('EVENT_BUS_BACKEND', 'local')
+    if backend not in EVENT_BUS_BACKENDS:
+        raise ValueError(f'未知的事件总线类型: {backend}')
+
+    if not isinstance(event_bus, EVENT_BUS_BACKENDS[backend]):
+        event_bus = EVENT_BUS_BACKENDS[backend]()
+    return event_bus
+
+
+def get_event_bus():
+    """获取当前事件总线"""
+    return event_bus
+
+
+def publish_order_event(event_type, order_data):
+    """发布订单事件（应在事务提交后调用）"""
+    event_bus.publish({
+        'type': event_type,
+        'user_id': order_data.get('user_id'),
+        'order': order_data
+    })
@@ -0,0 +1,258 @@
+"""菜单图片处理"""
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from extensions import db
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # 未安装 Pillow 时只保存原图，不生成缩略图
+    Image = None
+
+# 上传流式写入磁盘时每次读取的字节数
+CHUNK_SIZE = 64 * 1024
+
+# 原图格式 -> 扩展名
+IMAGE_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+
+# 图片文件名：<前两位>/<哈希>.<扩展名>，缩略图为 <哈希>_<尺寸>q<质量>.webp
+IMAGE_NAME_PATTERN = re.compile(r'^([0-9a-f]{2})/(\1[0-9a-f]{62})(_\d+q\d+)?\.(jpg|png|gif|webp)$')
+
+# 未完成上传的临时文件保留时间（秒），超过后由孤儿文件清理删除
+STALE_UPLOAD_SECONDS = 3600
+
+
+class ImageUploadError(Exception):
+    """上传的文件不是支持的图片"""
+
+
+def image_dir():
+    """菜单图片目录"""
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], 'menu')
+
+
+def _image_url(relative_path):
+    return f"{current_app.config.get('MEDIA_URL_PREFIX', '/api/media')}/menu/{relative_path}"
+
+
+def _variant_name(digest, max_size, quality):
+    """缩略图文件名包含尺寸和质量，配置变化后生成新文件，旧URL的内容保持不变"""
+    return f'{digest[:2]}/{digest}_{max_size}q{quality}.webp'
+
+
+class ImagePipeline:
+    """菜单图片处理流水线
+
+    上传的图片边读边写入临时文件并计算 SHA-256，按内容哈希命名保存
+    （UPLOAD_FOLDER/menu/<前两位>/<哈希>.<扩展名>），相同图片只保存一份，
+    文件内容与URL一一对应，可以永久缓存。
+    各尺寸的 WebP 缩略图（IMAGE_VARIANTS，名称 -> 最长边像素）在后台线程池中生成，
+    完成后写入使用该图片的菜单项的 image_variants 字段
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=current_app.config.get('IMAGE_WORKERS', 2),
+                        thread_name_prefix='image-variants'
+                    )
+        return self._executor
+
+    def store_upload(self, file):
+        """保存上传的图片，返回 (内容哈希, 原图URL)"""
+        directory = image_dir()
+        os.makedirs(directory, exist_ok=True)
+
+        # 流式写入临时文件，同时计算哈希，不把整个文件读入内存
+        sha256 = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.upload')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                while True:
+                    chunk = file.stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    sha256.update(chunk)
+                    temp_file.write(chunk)
+
+            extension = self._detect_extension(temp_path, file.filename)
+            digest = sha256.hexdigest()
+            relative_path = f'{digest[:2]}/{digest}.{extension}'
+            target_path = os.path.join(directory, relative_path)
+
+            if os.path.exists(target_path):
+                # 相同内容已存在，丢弃本次上传
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                os.replace(temp_path, target_path)
+
+            return digest, _image_url(relative_path)
+
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def _detect_extension(path, filename):
+        """按文件内容确定扩展名（不信任文件名），未安装 Pillow 时退回文件名"""
+        if Image is None:
+            extension = os.path.splitext(filename or '')[1].lstrip('.').lower()
+            if extension not in ('jpg', 'jpeg', 'png', 'gif', 'webp'):
+                raise ImageUploadError('图片格式不支持')
+            return 'jpg' if extension == 'jpeg' else extension
+
+        try:
+            with Image.open(path) as image:
+                image_format = image.format
+                image.verify()
+        except Exception:
+            raise ImageUploadError('无法识别的图片文件')
+
+        if image_format not in IMAGE_FORMATS:
+            raise ImageUploadError('图片格式不支持')
+        return IMAGE_FORMATS[image_format]
+
+    def existing_variants(self, digest):
+        """已生成的全部缩略图URL，有缺失时返回 None"""
+        if Image is None:
+            return None
+
+        config = current_app.config
+        quality = config.get('IMAGE_WEBP_QUALITY', 80)
+        variants = {}
+        for variant, max_size in config.get('IMAGE_VARIANTS', {}).items():
+            relative_path = _variant_name(digest, max_size, quality)
+            if not os.path.exists(os.path.join(image_dir(), relative_path)):
+                return None
+            variants[variant] = _image_url(relative_path)
+        return variants
+
+    def schedule_variants(self, digest, image_url):
+        """提交后台任务生成缩略图（在菜单项提交之后调用）"""
+        if Image is None:
+            return None
+
+        app = current_app._get_current_object()
+        return self._get_executor().submit(self._generate_variants, app, digest, image_url)
+
+    @staticmethod
+    def _generate_variants(app, digest, image_url):
+        from models.menu import MenuItem
+        from services.menu_catalog import menu_catalog
+
+        with app.app_context():
+            try:
+                config = app.config
+                quality = config.get('IMAGE_WEBP_QUALITY', 80)
+                directory = image_dir()
+                relative_path = '/'.join(image_url.rsplit('/', 2)[-2:])
+                variants = {}
+
+                with Image.open(os.path.join(directory, relative_path)) as source:
+                    source = ImageOps.exif_transpose(source)
+                    if source.mode not in ('RGB', 'RGBA'):
+                        source = source.convert('RGBA' if 'transparency' in source.info else 'RGB')
+
+                    for variant, max_size in config.get('IMAGE_VARIANTS', {}).items():
+                        variant_path = _variant_name(digest, max_size, quality)
+                        target_path = os.path.join(directory, variant_path)
+                        if not os.path.exists(target_path):
+                            image = source.copy()
+                            image.thumbnail((max_size, max_size), Image.LANCZOS)
+                            # 先写临时文件再原子替换，避免读到写了一半的文件；
+                            # 同一图片的多个任务可能同时生成，临时文件名各不相同
+                            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target_path), suffix='.tmp')
+                            try:
+                                with os.fdopen(fd, 'wb') as temp_file:
+                                    image.save(temp_file, 'WEBP', quality=quality, method=4)
+                                os.replace(temp_path, target_path)
+                            except Exception:
+                                if os.path.exists(temp_path):
+                                    os.remove(temp_path)
+                                raise
+                        variants[variant] = _image_url(variant_path)
+
+                table = MenuItem.__table__
+                db.session.execute(
+                    table.update().where(table.c.image_hash == digest).values(
+                        image_variants=variants,
+                        updated_at=table.c.updated_at  # 缩略图生成不算菜单修改
+                    )
+                )
+                db.session.commit()
+                menu_catalog.invalidate()
+                return variants
+
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f'生成缩略图失败 {digest}: {e}')
+                return None
+            finally:
+                db.session.remove()
+
+    def remove_if_orphaned(self, digest):
+        """没有菜单项再使用该图片时删除原图和缩略图，返回删除的文件数
+
+        在菜单项删除或更换图片并提交之后调用
+        """
+        from models.menu import MenuItem
+
+        if not digest or MenuItem.query.filter_by(image_hash=digest).first():
+            return 0
+
+        removed = 0
+        prefix_dir = os.path.join(image_dir(), digest[:2])
+        if os.path.isdir(prefix_dir):
+            for filename in os.listdir(prefix_dir):
+                if filename.startswith(digest):
+                    os.remove(os.path.join(prefix_dir, filename))
+                    removed += 1
+        return removed
+
+    def purge_orphans(self, grace_seconds=STALE_UPLOAD_SECONDS):
+        """扫描图片目录，删除未被任何菜单项引用的图片和遗留的临时文件
+
+        最近 grace_seconds 秒内写入的文件不删除，避免误删正在保存的上传
+        """
+        from models.menu import MenuItem
+
+        directory = image_dir()
+        if not os.path.isdir(directory):
+            return 0
+
+        referenced = {row[0] for row in db.session.query(MenuItem.image_hash).filter(
+            MenuItem.image_hash.isnot(None)
+        ).all()}
+        cutoff = time.time() - grace_seconds
+
+        removed = 0
+        for root, _, filenames in os.walk(directory):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                relative_path = os.path.relpath(path, directory).replace(os.sep, '/')
+                match = IMAGE_NAME_PATTERN.match(relative_path)
+                if match and match.group(2) in referenced:
+                    continue
+                if match or filename.endswith(('.upload', '.tmp')):
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+
+# 全局图片处理实例
+image_pipeline = ImagePipeline()
@@ -0,0 +1,80 @@
+"""后厨订单队列"""
+import threading
+import time
+from flask import current_app
+from models.order import Order
+
+# 后厨需要处理的订单状态
+ACTIVE_STATUSES = ('pending', 'preparing', 'ready')
+
+
+class KitchenQueue:
+    """进行中订单的内存队列
+
+    保存待处理、制作中、待取餐的订单（订单项和菜单名称已预先解析），按下单顺序排列。
+    下单、状态变更、取消后由 OrderService 增量更新，读取时不访问数据库；
+    首次使用时从数据库加载，TTL 到期后全量重建以同步其他进程中的变更
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._orders = None
+        self._loaded_at = 0.0
+
+    def _build(self):
+        from services.order_service import OrderService
+
+        orders = Order.query.filter(
+            Order.status.in_(ACTIVE_STATUSES)
+        ).order_by(Order.id).all()
+        self._orders = {order_data['id']: order_data for order_data in OrderService.serialize_orders(orders)}
+        self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        """返回已加载的队列；在同一把锁内检查和重建，不会读到并发 invalidate() 置空的结果"""
+        ttl = current_app.config.get('KITCHEN_QUEUE_TTL', 60)
+        orders = self._orders
+        if orders is not None and time.monotonic() - self._loaded_at < ttl:
+            return orders
+        with self._lock:
+            if self._orders is None or time.monotonic() - self._loaded_at >= ttl:
+                self._build()
+            return self._orders
+
+    def apply(self, order_data):
+        """订单新增或变更后更新队列（未加载时忽略，首次使用时会全量加载）"""
+        with self._lock:
+            if self._orders is None:
+                return
+
+            order_id = order_data['id']
+            if order_data['status'] not in ACTIVE_STATUSES:
+                self._orders.pop(order_id, None)
+                return
+
+            current = self._orders.get(order_id)
+            if current is None:
+                if 'order_items' in order_data:
+                    self._orders[order_id] = order_data
+                else:
+                    # 缺少订单项明细时等下次重建再加入
+                    self._loaded_at = 0.0
+                return
+
+            # 状态变更事件不带订单项，沿用已解析的明细
+            self._orders[order_id] = {**current, **order_data, 'order_items': current['order_items']}
+
+    def invalidate(self):
+        """使队列失效，下次使用时重建"""
+        with self._lock:
+            self._orders = None
+
+    def get_orders(self):
+        """获取进行中的订单（按下单顺序）"""
+        orders = self._ensure_loaded()
+        with self._lock:
+            return list(orders.values())
+
+
+# 全局后厨队列实例
+kitchen_queue = KitchenQueue()
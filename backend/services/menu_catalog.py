@@ -0,0 +1,163 @@
+"""菜单目录缓存"""
+import hashlib
+import json
+import threading
+import time
+from flask import current_app
+from models.menu import MenuItem
+from services.menu_search import MenuSearchIndex
+
+
+class MenuCatalog:
+    """进程内菜单目录缓存
+
+    缓存预先序列化好的菜单项字典，并按ID和分类建立索引。
+    菜单写操作提交后调用 invalidate() 使缓存失效，TTL 作为兜底，
+    用于多进程部署时其它 worker 的写入也能在有限时间内生效。
+    返回的字典在各请求间共享，调用方不应修改。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        """使缓存失效，下次读取时从数据库重建"""
+        with self._lock:
+            self._snapshot = None
+            self.version += 1
+
+    def _build(self, version):
+        """从数据库加载全部菜单项并建立索引"""
+        menu_items = MenuItem.query.order_by(MenuItem.category, MenuItem.name, MenuItem.id).all()
+
+        items = [item.to_dict() for item in menu_items]
+        by_id = {item['id']: item for item in items}
+        by_category = {}
+        for item in items:
+            by_category.setdefault(item['category'], []).append(item)
+
+        # 预先筛选可用商品，分页时直接切片
+        available = [item for item in items if item['is_available']]
+        available_by_category = {}
+        for item in available:
+            available_by_category.setdefault(item['category'], []).append(item)
+
+        # 热门商品按热度分数排序
+        popular = sorted(
+            (item for item in available if item['is_popular']),
+            key=lambda item: item['popularity_score'] or 0,
+            reverse=True
+        )
+
+        # 热度分数最近一次重算的时间（持久化在菜单表中，各进程一致）
+        popularity_updated_at = max(
+            (item.popularity_updated_at for item in menu_items if item.popularity_updated_at),
+            default=None
+        )
+
+        # 内容摘要作为 HTTP ETag：只取决于菜单数据，各 worker 进程计算结果一致
+        digest = hashlib.sha1(
+            json.dumps(items, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+        ).hexdigest()
+
+        return {
+            'version': version,
+            'etag': f'menu-{digest}',
+            'loaded_at': time.monotonic(),
+            'items': items,
+            'by_id': by_id,
+            'by_category': by_category,
+            'available': available,
+            'available_by_category': available_by_category,
+            'popular': popular,
+            'popularity_updated_at': popularity_updated_at
+        }
+
+    def _get_snapshot(self):
+        """获取当前快照，缺失或过期时重建"""
+        ttl = current_app.config.get('MENU_CACHE_TTL', 300)
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot['loaded_at'] < ttl:
+            self.hits += 1
+            return snapshot
+
+        with self._lock:
+            # 等锁期间可能已被其它线程重建
+            snapshot = self._snapshot
+            if snapshot is not None and time.monotonic() - snapshot['loaded_at'] < ttl:
+                self.hits += 1
+                return snapshot
+
+            self.misses += 1
+            snapshot = self._build(self.version)
+            self._snapshot = snapshot
+            return snapshot
+
+    def get_items(self, available_only=True, category=None):
+        """获取菜单项列表（按分类、名称排序）"""
+        snapshot = self._get_snapshot()
+        if available_only:
+            if category:
+                return snapshot['available_by_category'].get(category, [])
+            return snapshot['available']
+
+        if category:
+            return snapshot['by_category'].get(category, [])
+        return snapshot['items']
+
+    def get_item(self, item_id):
+        """根据ID获取菜单项"""
+        return self._get_snapshot()['by_id'].get(item_id)
+
+    def get_popular(self, limit=None):
+        """获取热门商品（按热度分数排序）"""
+        popular = self._get_snapshot()['popular']
+        return popular[:limit] if limit else popular
+
+    def search(self, keyword, available_only=True):
+        """全文搜索菜单项，按相关度排序
+
+        索引在快照首次搜索时构建，菜单写操作使快照失效后随之重建
+        """
+        snapshot = self._get_snapshot()
+        index = snapshot.get('search_index')
+        if index is None:
+            with self._lock:
+                index = snapshot.get('search_index')
+                if index is None:
+                    index = MenuSearchIndex(snapshot['items'])
+                    snapshot['search_index'] = index
+
+        items = index.search(keyword)
+        if available_only:
+            items = [item for item in items if item['is_available']]
+        return items
+
+    def get_popularity_updated_at(self):
+        """热度分数最近一次重算的时间，从未重算时返回 None"""
+        return self._get_snapshot()['popularity_updated_at']
+
+    def get_etag(self):
+        """当前菜单数据的 ETag"""
+        return self._get_snapshot()['etag']
+
+    def get_categories(self):
+        """获取所有分类"""
+        return list(self._get_snapshot()['by_category'].keys())
+
+    def stats(self):
+        """缓存命中统计"""
+        return {
+            'version': self.version,
+            'cached': self._snapshot is not None,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+# 全局菜单目录实例
+menu_catalog = MenuCatalog()
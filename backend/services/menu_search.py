@@ -0,0 +1,114 @@
+"""菜单搜索索引"""
+import re
+from bisect import bisect_left
+
+try:
+    from pypinyin import lazy_pinyin
+except ImportError:  # 未安装 pypinyin 时不提供拼音检索
+    lazy_pinyin = None
+
+# 字段权重：名称命中优先于分类和描述
+FIELD_WEIGHTS = {'name': 3, 'category': 2, 'description': 1}
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+|[\u4e00-\u9fff]+')
+_CJK_PATTERN = re.compile(r'[\u4e00-\u9fff]')
+
+
+def _is_cjk(text):
+    return bool(_CJK_PATTERN.match(text))
+
+
+def tokenize(text, with_pinyin=False):
+    """分词：英文数字按单词切分，中文按单字和相邻双字切分
+
+    with_pinyin 为 True 且安装了 pypinyin 时，中文片段额外生成全拼和首字母词元
+    """
+    tokens = []
+    for run in _TOKEN_PATTERN.findall((text or '').lower()):
+        if not _is_cjk(run):
+            tokens.append(run)
+            continue
+
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+
+        if with_pinyin and lazy_pinyin:
+            syllables = lazy_pinyin(run)
+            tokens.append(''.join(syllables))
+            tokens.append(''.join(syllable[0] for syllable in syllables if syllable))
+    return tokens
+
+
+class MenuSearchIndex:
+    """菜单项倒排索引
+
+    中文词元精确匹配（查询按双字切分后要求全部命中），英文、数字及拼音词元
+    按前缀匹配；结果按字段权重打分排序，分数相同时保持菜单原有顺序
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.postings = {}
+
+        for position, item in enumerate(items):
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in set(tokenize(item.get(field), with_pinyin=field == 'name')):
+                    postings = self.postings.setdefault(token, {})
+                    if postings.get(position, 0) < weight:
+                        postings[position] = weight
+
+        # 非中文词元的有序词表，用于前缀查找
+        self.vocabulary = sorted(token for token in self.postings if not _is_cjk(token))
+
+    def _match(self, token):
+        """返回命中该词元的 {位置: 权重}"""
+        if _is_cjk(token):
+            return self.postings.get(token, {})
+
+        matched = {}
+        start = bisect_left(self.vocabulary, token)
+        for word in self.vocabulary[start:]:
+            if not word.startswith(token):
+                break
+            for position, weight in self.postings[word].items():
+                if matched.get(position, 0) < weight:
+                    matched[position] = weight
+        return matched
+
+    def _query_tokens(self, keyword):
+        """查询分词：中文片段只取双字（单字片段取单字），保证多字词整体命中"""
+        tokens = []
+        for run in _TOKEN_PATTERN.findall(keyword.lower()):
+            if _is_cjk(run) and len(run) > 1:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            else:
+                tokens.append(run)
+        return list(dict.fromkeys(tokens))
+
+    def search(self, keyword):
+        """搜索，返回按相关度排序的菜单项字典列表"""
+        tokens = self._query_tokens(keyword or '')
+        if not tokens:
+            return []
+
+        # 从命中最少的词元开始求交集
+        scores = None
+        for matched in sorted((self._match(token) for token in tokens), key=len):
+            if scores is None:
+                scores = dict(matched)
+            else:
+                scores = {
+                    position: score + matched[position]
+                    for position, score in scores.items() if position in matched
+                }
+            if not scores:
+                return []
+
+        # 名称以关键词开头的额外加分
+        keyword = keyword.strip().lower()
+        for position in scores:
+            if (self.items[position]['name'] or '').lower().startswith(keyword):
+                scores[position] += FIELD_WEIGHTS['name']
+
+        ranked = sorted(scores.items(), key=lambda pair: (-pair[1], pair[0]))
+        return [self.items[position] for position, _ in ranked]
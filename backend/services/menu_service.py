@@ -1,47 +1,54 @@
 """菜单服务"""
 from models.menu import MenuItem
 from extensions import db
-from utils.auth_utils import save_file, allowed_file
+from utils.auth_utils import allowed_file
+from services.menu_catalog import menu_catalog
+from services.image_pipeline import image_pipeline, ImageUploadError
 import os
 
 class MenuService:
     """菜单服务类"""
 
     @staticmethod
-    def get_all_menu_items(available_only=True, category=None):
-        """获取所有菜单项"""
-        try:
-            query = MenuItem.query
+    def get_all_menu_items(available_only=True, category=None, page=None, per_page=None):
+        """获取所有菜单项
 
-            # 筛选可用商品
-            if available_only:
-                query = query.filter_by(is_available=True)
+        传入 page 和 per_page 时只返回当前页，total 仍为筛选后的总数
+        """
+        try:
+            # 从菜单目录缓存读取
+            menu_items = menu_catalog.get_items(available_only, category)
+            total = len(menu_items)
 
-            # 按分类筛选
-            if category:
-                query = query.filter_by(category=category)
+            if page and per_page:
+                start = (page - 1) * per_page
+                menu_items = menu_items[start:start + per_page]
 
-            menu_items = query.order_by(MenuItem.category, MenuItem.name).all()
             return {
                 'success': True,
-                'menu_items': [item.to_dict() for item in menu_items],
-                'total': len(menu_items)
+                'menu_items': menu_items,
+                'total': total
             }
 
         except Exception as e:
             return {'success': False, 'errors': [f'获取菜单失败: {str(e)}']}
 
+    @staticmethod
+    def get_menu_etag():
+        """当前菜单数据的 ETag，菜单、热度数据任何变化都会改变"""
+        return menu_catalog.get_etag()
+
     @staticmethod
     def get_menu_item_by_id(item_id):
         """根据ID获取菜单项"""
         try:
-            menu_item = MenuItem.query.get(item_id)
+            menu_item = menu_catalog.get_item(item_id)
             if not menu_item:
                 return {'success': False, 'errors': ['菜单项不存在']}
 
             return {
                 'success': True,
-                'menu_item': menu_item.to_dict()
+                'menu_item': menu_item
             }
 
         except Exception as e:
@@ -57,12 +64,9 @@ class MenuService:
                 return {'success': False, 'errors': errors}
 
             # 处理图片上传
-            image_url = None
+            image = None
             if image_file and allowed_file(image_file.filename):
-                upload_folder = 'static/uploads/menu'
-                image_url = save_file(image_file, upload_folder)
-                if image_url:
-                    image_url = '/' + image_url.replace('\\', '/')  # 统一路径分隔符
+                image = MenuService._store_image(image_file)
 
             # 创建菜单项
             menu_item = MenuItem(
@@ -70,12 +74,17 @@ class MenuService:
                 description=item_data.get('description'),
                 price=item_data.get('price'),
                 category=item_data.get('category', 'coffee'),
-                image_url=image_url,
+                image_url=image['image_url'] if image else item_data.get('image_url'),
                 is_available=item_data.get('is_available', True)
             )
+            if image:
+                menu_item.image_hash = image['image_hash']
+                menu_item.image_variants = image['image_variants']
 
             db.session.add(menu_item)
             db.session.commit()
+            menu_catalog.invalidate()
+            MenuService._schedule_variants(image)
 
             return {
                 'success': True,
@@ -83,6 +92,9 @@ class MenuService:
                 'menu_item': menu_item.to_dict()
             }
 
+        except ImageUploadError as e:
+            db.session.rollback()
+            return {'success': False, 'errors': [str(e)]}
         except Exception as e:
             db.session.rollback()
             return {'success': False, 'errors': [f'创建菜单项失败: {str(e)}']}
@@ -101,12 +113,11 @@ class MenuService:
                 return {'success': False, 'errors': errors}
 
             # 处理图片上传
+            image = None
+            old_image_hash, old_image_url = menu_item.image_hash, menu_item.image_url
             if image_file and allowed_file(image_file.filename):
-                upload_folder = 'static/uploads/menu'
-                image_url = save_file(image_file, upload_folder)
-                if image_url:
-                    image_url = '/' + image_url.replace('\\', '/')  # 统一路径分隔符
-                    item_data['image_url'] = image_url
+                image = MenuService._store_image(image_file)
+                item_data['image_url'] = image['image_url']
 
             # 更新菜单项
             allowed_fields = ['name', 'description', 'price', 'category', 'image_url', 'is_available']
@@ -114,7 +125,21 @@ class MenuService:
                 if field in item_data:
                     setattr(menu_item, field, item_data[field])
 
+            if image:
+                menu_item.image_hash = image['image_hash']
+                menu_item.image_variants = image['image_variants']
+            elif 'image_url' in item_data:
+                # 直接指定的图片地址没有缩略图
+                menu_item.image_hash = None
+                menu_item.image_variants = None
+
             db.session.commit()
+            menu_catalog.invalidate()
+            MenuService._schedule_variants(image)
+
+            # 更换图片后删除不再使用的旧图片
+            if old_image_url != menu_item.image_url:
+                MenuService._remove_image_files(old_image_hash, old_image_url)
 
             return {
                 'success': True,
@@ -122,10 +147,44 @@ class MenuService:
                 'menu_item': menu_item.to_dict()
             }
 
+        except ImageUploadError as e:
+            db.session.rollback()
+            return {'success': False, 'errors': [str(e)]}
         except Exception as e:
             db.session.rollback()
             return {'success': False, 'errors': [f'更新菜单项失败: {str(e)}']}
 
+    @staticmethod
+    def _store_image(image_file):
+        """保存上传图片（按内容去重），缩略图已存在时直接复用"""
+        image_hash, image_url = image_pipeline.store_upload(image_file)
+        return {
+            'image_hash': image_hash,
+            'image_url': image_url,
+            'image_variants': image_pipeline.existing_variants(image_hash)
+        }
+
+    @staticmethod
+    def _schedule_variants(image):
+        """菜单项提交后，在后台生成缺失的缩略图"""
+        if image and image['image_variants'] is None:
+            image_pipeline.schedule_variants(image['image_hash'], image['image_url'])
+
+    @staticmethod
+    def _remove_image_files(image_hash, image_url):
+        """删除不再被任何菜单项使用的图片文件"""
+        try:
+            if image_hash:
+                image_pipeline.remove_if_orphaned(image_hash)
+            elif image_url:
+                # 旧版按时间戳命名的图片，URL 为 /static/uploads/... 或 //static/uploads/...
+                # （旧版保存时在已带斜杠的路径前又拼了一个斜杠）；只删除上传目录内的文件
+                file_path = os.path.normpath(image_url.lstrip('/'))
+                if file_path.startswith(os.path.join('static', 'uploads', '')) and os.path.exists(file_path):
+                    os.remove(file_path)
+        except Exception:
+            pass  # 删除文件失败不影响数据库操作
+
     @staticmethod
     def delete_menu_item(item_id):
         """删除菜单项"""
@@ -138,17 +197,13 @@ class MenuService:
             if menu_item.order_items.count() > 0:
                 return {'success': False, 'errors': ['该菜单项有关联订单，无法删除']}
 
-            # 删除图片文件
-            if menu_item.image_url:
-                try:
-                    file_path = menu_item.image_url.lstrip('/')
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                except:
-                    pass  # 删除文件失败不影响数据库操作
-
+            image_hash, image_url = menu_item.image_hash, menu_item.image_url
             db.session.delete(menu_item)
             db.session.commit()
+            menu_catalog.invalidate()
+
+            # 提交后删除不再使用的图片文件
+            MenuService._remove_image_files(image_hash, image_url)
 
             return {
                 'success': True,
@@ -169,6 +224,7 @@ class MenuService:
 
             menu_item.is_available = not menu_item.is_available
             db.session.commit()
+            menu_catalog.invalidate()
 
             status_text = '上架' if menu_item.is_available else '下架'
             return {
@@ -185,7 +241,7 @@ class MenuService:
     def get_menu_categories():
         """获取所有菜单分类"""
         try:
-            categories = MenuItem.get_categories()
+            categories = menu_catalog.get_categories()
             return {
                 'success': True,
                 'categories': categories
@@ -196,50 +252,44 @@ class MenuService:
 
     @staticmethod
     def get_popular_items(limit=10):
-        """获取热门商品"""
+        """获取热门商品
+
+        读取菜单目录中预先排好序的热门列表，热度数据过期时触发后台重算
+        """
         try:
-            popular_items = MenuItem.get_popular_items(limit)
-            result = []
-            for item_data in popular_items:
-                menu_item = MenuItem.query.get(item_data.menu_id)
-                if menu_item:
-                    item_dict = menu_item.to_dict()
-                    item_dict['total_quantity'] = item_data.total_quantity
-                    result.append(item_dict)
+            from services.popularity_service import PopularityService
+            PopularityService.refresh_if_stale()
 
             return {
                 'success': True,
-                'popular_items': result
+                'popular_items': menu_catalog.get_popular(limit)
             }
 
         except Exception as e:
             return {'success': False, 'errors': [f'获取热门商品失败: {str(e)}']}
 
     @staticmethod
-    def search_menu_items(keyword, available_only=True):
-        """搜索菜单项"""
-        try:
-            query = MenuItem.query
+    def search_menu_items(keyword, available_only=True, page=None, per_page=None):
+        """搜索菜单项
 
-            # 筛选可用商品
-            if available_only:
-                query = query.filter_by(is_available=True)
-
-            # 搜索关键词
+        使用菜单目录上的倒排索引（支持中文双字切分、前缀及拼音匹配），结果按相关度排序；
+        传入 page 和 per_page 时只返回当前页，total 仍为命中总数
+        """
+        try:
             if keyword:
-                search_pattern = f'%{keyword}%'
-                query = query.filter(
-                    (MenuItem.name.like(search_pattern)) |
-                    (MenuItem.description.like(search_pattern)) |
-                    (MenuItem.category.like(search_pattern))
-                )
+                menu_items = menu_catalog.search(keyword, available_only)
+            else:
+                menu_items = menu_catalog.get_items(available_only)
+            total = len(menu_items)
 
-            menu_items = query.order_by(MenuItem.category, MenuItem.name).all()
+            if page and per_page:
+                start = (page - 1) * per_page
+                menu_items = menu_items[start:start + per_page]
 
             return {
                 'success': True,
-                'menu_items': [item.to_dict() for item in menu_items],
-                'total': len(menu_items)
+                'menu_items': menu_items,
+                'total': total
             }
 
         except Exception as e:
@@ -0,0 +1,147 @@
+"""订单搜索服务"""
+import re
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from models.order import Order
+from models.user import User
+from extensions import db
+
+_ORDER_NUMBER_PATTERN = re.compile(r'^co\d*$', re.IGNORECASE)
+_DIGITS_PATTERN = re.compile(r'^\d+$')
+
+# 部分匹配最多返回的用户数
+MAX_PARTIAL_USERS = 500
+
+
+def escape_like(text):
+    """转义 LIKE 通配符，配合 escape='\\' 按字面匹配用户输入"""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _trigrams(text):
+    """字符串的三字组集合（不足三个字符时为其本身）"""
+    text = text.lower()
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class UserNgramIndex:
+    """用户名、邮箱的三字组倒排索引
+
+    用于订单搜索中的部分匹配：先按三字组求交得到候选用户，再逐个校验子串，
+    避免对 users 表做 LIKE '%kw%' 全表扫描。注册时增量加入，TTL 到期后全量重建
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._grams = None
+        self._texts = {}
+        self._loaded_at = 0.0
+
+    def _build(self):
+        grams = {}
+        texts = {}
+        for user_id, username, email in db.session.query(User.id, User.username, User.email).all():
+            text = f'{username}\n{email}'.lower()
+            texts[user_id] = text
+            for gram in _trigrams(username) | _trigrams(email):
+                grams.setdefault(gram, set()).add(user_id)
+        self._grams = grams
+        self._texts = texts
+        self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        """返回已加载的 (三字组倒排表, 用户文本)；在同一把锁内检查和重建"""
+        ttl = current_app.config.get('ORDER_SEARCH_INDEX_TTL', 300)
+        grams, texts = self._grams, self._texts
+        if grams is not None and time.monotonic() - self._loaded_at < ttl:
+            return grams, texts
+        with self._lock:
+            if self._grams is None or time.monotonic() - self._loaded_at >= ttl:
+                self._build()
+            return self._grams, self._texts
+
+    def add(self, user):
+        """新增或更新用户时加入索引（未构建时忽略，首次使用时会全量加载）"""
+        with self._lock:
+            if self._grams is None:
+                return
+            text = f'{user.username}\n{user.email}'.lower()
+            self._texts[user.id] = text
+            for gram in _trigrams(user.username) | _trigrams(user.email):
+                self._grams.setdefault(gram, set()).add(user.id)
+
+    def invalidate(self):
+        """使索引失效，下次使用时重建"""
+        with self._lock:
+            self._grams = None
+
+    def search(self, keyword, limit=MAX_PARTIAL_USERS):
+        """返回用户名或邮箱包含关键词的用户ID列表"""
+        keyword = keyword.lower()
+        grams = _trigrams(keyword)
+        if len(keyword) < 3 or not grams:
+            return []
+
+        # 使用 _ensure_loaded 返回的索引，并发的 invalidate() 不影响本次查询；
+        # 倒排表可能被 add() 修改，求交在锁内进行
+        index, texts = self._ensure_loaded()
+        with self._lock:
+            postings = sorted((index.get(gram, set()) for gram in grams), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates &= posting
+                if not candidates:
+                    return []
+
+        matched = sorted(user_id for user_id in candidates if keyword in texts.get(user_id, ''))
+        return matched[:limit]
+
+
+# 全局用户索引实例
+user_ngram_index = UserNgramIndex()
+
+
+class OrderSearchService:
+    """订单搜索服务类"""
+
+    @staticmethod
+    def build_filter(keyword):
+        """根据关键词选择可走索引的搜索方式
+
+        返回 (搜索方式, 订单过滤条件)：
+        - order_number: CO 开头按订单号前缀匹配（唯一索引）
+        - ticket: 不超过4位的纯数字视为今日订单的流水号，精确匹配订单号
+        - order_number_prefix: 更长的纯数字按 CO+数字 前缀匹配
+        - email / username: 邮箱或用户名精确匹配
+        - partial: 用户名、邮箱部分匹配（三字组索引）；不足3个字符时按用户名前缀匹配
+        """
+        if _ORDER_NUMBER_PATTERN.match(keyword):
+            return 'order_number', Order.order_number.like(f'{keyword.upper()}%')
+
+        if _DIGITS_PATTERN.match(keyword):
+            if len(keyword) <= 4:
+                today = datetime.now().strftime('%Y%m%d')
+                return 'ticket', Order.order_number == f'CO{today}{int(keyword):04d}'
+            return 'order_number_prefix', Order.order_number.like(f'CO{keyword}%')
+
+        if '@' in keyword:
+            user = User.query.filter_by(email=keyword).first()
+            if user:
+                return 'email', Order.user_id == user.id
+        else:
+            user = User.query.filter_by(username=keyword).first()
+            if user:
+                return 'username', Order.user_id == user.id
+
+        if len(keyword) < 3:
+            user_ids = [row[0] for row in db.session.query(User.id).filter(
+                User.username.like(f'{escape_like(keyword)}%', escape='\\')
+            ).limit(MAX_PARTIAL_USERS).all()]
+        else:
+            user_ids = user_ngram_index.search(keyword)
+
+        return 'partial', Order.user_id.in_(user_ids)
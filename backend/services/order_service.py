@@ -3,9 +3,34 @@ from models.order import Order
 from models.order_item import OrderItem
 from models.menu import MenuItem
 from models.user import User
+from models.daily_sales_rollup import DailySalesRollup
+from services.popularity_service import PopularityService
+from services.event_bus import publish_order_event
+from services.kitchen_queue import kitchen_queue
+from utils.http_cache import make_etag
 from extensions import db
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import func, case
+from sqlalchemy.orm import joinedload
+import base64
+
+# 订单状态流转规则
+VALID_TRANSITIONS = {
+    'pending': ['preparing', 'cancelled'],
+    'preparing': ['ready', 'cancelled'],
+    'ready': ['completed'],
+    'completed': [],  # 已完成订单不能再修改状态
+    'cancelled': []   # 已取消订单不能再修改状态
+}
+
+# 批量更新状态单次最多处理的订单数
+MAX_BULK_STATUS_ORDERS = 100
+
+# 订单列表每页最多返回的订单数
+MAX_ORDERS_PER_PAGE = 100
+
+# 订单状态编号，按状态流转方向递增，用于订单列表 ETag 的状态指纹
+STATUS_CODES = {'pending': 1, 'preparing': 2, 'ready': 3, 'completed': 4, 'cancelled': 5}
 
 class OrderService:
     """订单服务类"""
@@ -24,18 +49,37 @@ class OrderService:
             if not cart_items:
                 return {'success': False, 'errors': ['购物车为空']}
 
+            # 合并重复商品，保持购物车中的先后顺序
+            quantities = {}
+            for item in cart_items:
+                try:
+                    menu_id = int(item['menu_id'])
+                except (TypeError, ValueError):
+                    return {'success': False, 'errors': [f"商品ID {item['menu_id']} 不存在"]}
+                quantities[menu_id] = quantities.get(menu_id, 0) + item.get('quantity', 1)
+
+            # 订单号在独立的短事务中分配，放在本次会话的第一条查询之前：
+            # 分配时请求会话尚未占用连接，每个下单请求同一时刻只需要一个连接池连接。
+            # 下单校验失败时该序号作废，订单号可能不连续
+            order_number = Order.generate_order_number()
+
+            # 一次 IN 查询取出购物车中的全部商品
+            menu_items = {
+                menu_item.id: menu_item
+                for menu_item in MenuItem.query.filter(MenuItem.id.in_(quantities.keys())).all()
+            }
+
             total_price = 0
             validated_items = []
 
-            for item in cart_items:
-                menu_item = MenuItem.query.get(item['menu_id'])
+            for menu_id, quantity in quantities.items():
+                menu_item = menu_items.get(menu_id)
                 if not menu_item:
-                    return {'success': False, 'errors': [f"商品ID {item['menu_id']} 不存在"]}
+                    return {'success': False, 'errors': [f"商品ID {menu_id} 不存在"]}
 
                 if not menu_item.is_available:
                     return {'success': False, 'errors': [f"商品 {menu_item.name} 已下架"]}
 
-                quantity = item.get('quantity', 1)
                 if quantity <= 0:
                     return {'success': False, 'errors': [f"商品 {menu_item.name} 数量无效"]}
 
@@ -43,15 +87,10 @@ class OrderService:
                 total_price += subtotal
 
                 validated_items.append({
-                    'menu_id': menu_item.id,
-                    'quantity': quantity,
-                    'unit_price': menu_item.price,
-                    'subtotal': subtotal
+                    'menu_item': menu_item,
+                    'quantity': quantity
                 })
 
-            # 生成订单号
-            order_number = Order.generate_order_number()
-
             # 创建订单
             order = Order(
                 user_id=user_id,
@@ -65,23 +104,34 @@ class OrderService:
             db.session.add(order)
             db.session.flush()  # 获取order.id
 
-            # 创建订单项
-            for item_data in validated_items:
-                order_item = OrderItem(
-                    order_id=order.id,
-                    menu_id=item_data['menu_id'],
-                    quantity=item_data['quantity'],
-                    unit_price=item_data['unit_price'],
-                    subtotal=item_data['subtotal']
-                )
-                db.session.add(order_item)
+            # 同一事务内更新每日销售汇总和用户订单统计
+            DailySalesRollup.record_order(order)
+            User.record_order(user_id, order.total_price, order.created_at)
+            PopularityService.record_order(quantities)
+
+            # 批量插入订单项（executemany，一次往返）
+            db.session.execute(
+                OrderItem.__table__.insert(),
+                [{
+                    'order_id': order.id,
+                    'menu_id': item_data['menu_item'].id,
+                    'quantity': item_data['quantity'],
+                    'unit_price': item_data['menu_item'].price,
+                    'subtotal': item_data['menu_item'].price * item_data['quantity']
+                } for item_data in validated_items]
+            )
+
+            # 提交前序列化，避免提交后对象过期逐条重新加载
+            order_dict = OrderService.serialize_orders([order])[0]
 
             db.session.commit()
+            kitchen_queue.apply(order_dict)
+            publish_order_event('order_created', order_dict)
 
             return {
                 'success': True,
                 'message': '订单创建成功',
-                'order': order.to_dict(include_items=True)
+                'order': order_dict
             }
 
         except Exception as e:
@@ -89,15 +139,24 @@ class OrderService:
             return {'success': False, 'errors': [f'创建订单失败: {str(e)}']}
 
     @staticmethod
-    def get_user_orders(user_id, status=None, page=1, per_page=10):
-        """获取用户订单列表"""
+    def get_user_orders(user_id, status=None, page=1, per_page=10, cursor=None):
+        """获取用户订单列表
+
+        cursor 不为 None 时使用游标分页，返回 next_cursor 且不统计总数
+        """
         try:
+            per_page = OrderService.clamp_per_page(per_page)
+
             query = Order.query.filter_by(user_id=user_id)
 
             # 状态筛选
             if status:
                 query = query.filter_by(status=status)
 
+            # 游标分页
+            if cursor is not None:
+                return OrderService._cursor_page(query, cursor, per_page)
+
             # 按创建时间倒序
             query = query.order_by(Order.created_at.desc())
 
@@ -106,10 +165,7 @@ class OrderService:
                 page=page, per_page=per_page, error_out=False
             )
 
-            orders = []
-            for order in pagination.items:
-                order_data = order.to_dict(include_items=True)
-                orders.append(order_data)
+            orders = OrderService.serialize_orders(pagination.items)
 
             return {
                 'success': True,
@@ -124,15 +180,27 @@ class OrderService:
             return {'success': False, 'errors': [f'获取订单失败: {str(e)}']}
 
     @staticmethod
-    def get_all_orders(status=None, page=1, per_page=10):
-        """获取所有订单（管理员用）"""
+    def get_all_orders(status=None, page=1, per_page=10, cursor=None):
+        """获取所有订单（管理员用）
+
+        cursor 不为 None 时使用游标分页，返回 next_cursor 且不统计总数
+        """
         try:
-            query = Order.query
+            per_page = OrderService.clamp_per_page(per_page)
+
+            # 用户信息随订单一次联表加载
+            query = Order.query.options(joinedload(Order.user))
 
             # 状态筛选
             if status:
                 query = query.filter_by(status=status)
 
+            # 游标分页
+            if cursor is not None:
+                return OrderService._cursor_page(
+                    query, cursor, per_page, user_fields=('id', 'username', 'email')
+                )
+
             # 按创建时间倒序
             query = query.order_by(Order.created_at.desc())
 
@@ -141,16 +209,10 @@ class OrderService:
                 page=page, per_page=per_page, error_out=False
             )
 
-            orders = []
-            for order in pagination.items:
-                order_data = order.to_dict(include_items=True)
-                # 添加用户信息
-                order_data['user'] = {
-                    'id': order.user.id,
-                    'username': order.user.username,
-                    'email': order.user.email
-                }
-                orders.append(order_data)
+            # 添加用户信息
+            orders = OrderService.serialize_orders(
+                pagination.items, user_fields=('id', 'username', 'email')
+            )
 
             return {
                 'success': True,
@@ -164,6 +226,167 @@ class OrderService:
         except Exception as e:
             return {'success': False, 'errors': [f'获取订单失败: {str(e)}']}
 
+    @staticmethod
+    def encode_cursor(order):
+        """根据订单的 (created_at, id) 生成分页游标"""
+        raw = f'{order.created_at.isoformat()}|{order.id}'
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """解析分页游标，格式错误时抛出 ValueError"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+            created_at, order_id = raw.split('|')
+            return datetime.fromisoformat(created_at), int(order_id)
+        except Exception:
+            raise ValueError('无效的分页游标')
+
+    @staticmethod
+    def clamp_per_page(per_page):
+        """每页订单数限制在 1..MAX_ORDERS_PER_PAGE 之间"""
+        return min(max(int(per_page), 1), MAX_ORDERS_PER_PAGE)
+
+    @staticmethod
+    def paginate_by_cursor(query, cursor, per_page):
+        """按 (created_at, id) 倒序做游标分页
+
+        cursor 为空字符串时从第一页开始；不执行 COUNT，多取一条判断是否还有下一页。
+        返回 (订单列表, next_cursor)，没有下一页时 next_cursor 为 None
+        """
+        per_page = OrderService.clamp_per_page(per_page)
+        if cursor:
+            created_at, order_id = OrderService.decode_cursor(cursor)
+            query = query.filter(
+                db.or_(
+                    Order.created_at < created_at,
+                    db.and_(Order.created_at == created_at, Order.id < order_id)
+                )
+            )
+
+        orders = query.order_by(
+            Order.created_at.desc(), Order.id.desc()
+        ).limit(per_page + 1).all()
+
+        next_cursor = None
+        if len(orders) > per_page:
+            orders = orders[:per_page]
+            next_cursor = OrderService.encode_cursor(orders[-1])
+
+        return orders, next_cursor
+
+    @staticmethod
+    def _cursor_page(query, cursor, per_page, user_fields=None):
+        """游标分页并序列化订单"""
+        try:
+            orders, next_cursor = OrderService.paginate_by_cursor(query, cursor, per_page)
+        except ValueError as e:
+            return {'success': False, 'errors': [str(e)]}
+
+        return {
+            'success': True,
+            'orders': OrderService.serialize_orders(orders, user_fields=user_fields),
+            'per_page': per_page,
+            'next_cursor': next_cursor
+        }
+
+    @staticmethod
+    def serialize_orders(orders, user_fields=None):
+        """批量序列化订单（含订单项）
+
+        所有订单的订单项及其菜单项通过一次 IN 查询加载，查询次数与订单数量无关；
+        user_fields 不为空时附加用户信息，调用方应对 Order.user 使用 joinedload
+        """
+        order_ids = [order.id for order in orders]
+        items_by_order = {order_id: [] for order_id in order_ids}
+
+        if order_ids:
+            order_items = OrderItem.query.options(
+                joinedload(OrderItem.menu_item)
+            ).filter(
+                OrderItem.order_id.in_(order_ids)
+            ).order_by(OrderItem.id).all()
+
+            for order_item in order_items:
+                items_by_order[order_item.order_id].append(order_item)
+
+        result = []
+        for order in orders:
+            order_data = order.to_dict(include_items=True, items=items_by_order[order.id])
+            if user_fields:
+                order_data['user'] = {
+                    field: getattr(order.user, field) for field in user_fields
+                }
+            result.append(order_data)
+
+        return result
+
+    @staticmethod
+    def _order_items_version(*criteria):
+        """符合条件的订单的订单项版本
+
+        订单项创建后不再变化，只会随新订单增加，用数量和最大ID标识；
+        订单项中嵌入了菜单项的名称、价格和图片，只取这几个字段计入版本，
+        销量、热度、缩略图等变化不影响订单数据
+        """
+        item_count, last_item_id = db.session.query(
+            func.count(OrderItem.id), func.max(OrderItem.id)
+        ).join(Order, Order.id == OrderItem.order_id).filter(*criteria).one()
+        menu_fields = db.session.query(
+            MenuItem.id, MenuItem.name, MenuItem.price, MenuItem.image_url
+        ).filter(
+            MenuItem.id.in_(
+                db.session.query(OrderItem.menu_id)
+                .join(Order, Order.id == OrderItem.order_id)
+                .filter(*criteria)
+            )
+        ).order_by(MenuItem.id).all()
+        return make_etag(item_count, last_item_id, *menu_fields)
+
+    @staticmethod
+    def get_order_etag(order_id, user_id=None, is_admin=False):
+        """订单详情的 ETag，只查询版本字段；订单不存在或无权限时返回 None
+
+        状态变更会更新 updated_at；订单项及其中嵌入的菜单字段见 _order_items_version；
+        管理员视图附带用户信息，同时取决于用户的 updated_at
+        """
+        row = db.session.query(
+            Order.user_id, Order.status, Order.updated_at, User.updated_at
+        ).join(User, User.id == Order.user_id).filter(Order.id == order_id).first()
+        if not row:
+            return None
+
+        order_user_id, status, updated_at, user_updated_at = row
+        if not is_admin and order_user_id != user_id:
+            return None
+
+        items_version = OrderService._order_items_version(Order.id == order_id)
+        if is_admin:
+            return make_etag('order', order_id, status, updated_at, items_version, 'admin', user_updated_at)
+        return make_etag('order', order_id, status, updated_at, items_version)
+
+    @staticmethod
+    def get_user_orders_etag(user_id, status=None):
+        """用户订单列表的 ETag（订单数、最近更新时间、状态指纹和订单项版本）
+
+        MySQL 的 DATETIME 只精确到秒，同一秒内的多次状态变更 updated_at 不变；
+        状态指纹 sum(订单ID × 状态编号) 随每次状态变更而增大（状态只按编号递增的方向流转）
+        """
+        criteria = [Order.user_id == user_id]
+        if status:
+            criteria.append(Order.status == status)
+
+        status_code = case(
+            *[(Order.status == name, code) for name, code in STATUS_CODES.items()], else_=0
+        )
+        count, last_updated, status_sum = db.session.query(
+            func.count(Order.id), func.max(Order.updated_at), func.sum(Order.id * status_code)
+        ).filter(*criteria).one()
+        return make_etag(
+            'user-orders', user_id, status, count, last_updated, status_sum,
+            OrderService._order_items_version(*criteria)
+        )
+
     @staticmethod
     def get_order_by_id(order_id, user_id=None, is_admin=False):
         """获取订单详情"""
@@ -204,32 +427,127 @@ class OrderService:
                 return {'success': False, 'errors': ['订单不存在']}
 
             # 验证状态流转
-            valid_transitions = {
-                'pending': ['preparing', 'cancelled'],
-                'preparing': ['ready', 'cancelled'],
-                'ready': ['completed'],
-                'completed': [],  # 已完成订单不能再修改状态
-                'cancelled': []   # 已取消订单不能再修改状态
-            }
-
             current_status = order.status
-            if status not in valid_transitions.get(current_status, []):
+            if status not in VALID_TRANSITIONS.get(current_status, []):
                 return {'success': False, 'errors': [f'不能从 {current_status} 状态变更为 {status}']}
 
             # 更新状态
             order.update_status(status)
+            DailySalesRollup.move_order(order, current_status, status)
+            if status == 'cancelled':
+                User.record_cancellation(order.user_id, order.total_price)
             db.session.commit()
 
+            order_dict = order.to_dict()
+            kitchen_queue.apply(order_dict)
+            publish_order_event('order_status_changed', order_dict)
+
             return {
                 'success': True,
                 'message': f'订单状态更新为 {status}',
-                'order': order.to_dict()
+                'order': order_dict
             }
 
         except Exception as e:
             db.session.rollback()
             return {'success': False, 'errors': [f'更新订单状态失败: {str(e)}']}
 
+    @staticmethod
+    def bulk_update_order_status(order_ids, status):
+        """批量更新订单状态
+
+        一次查询取出所有订单并按 VALID_TRANSITIONS 校验，可流转的订单按原状态分组，
+        每组执行一条 UPDATE ... WHERE id IN (...) AND status = 原状态，全部在同一事务中提交；
+        销售汇总和用户消费金额按组合并后更新。返回每个订单ID的处理结果
+        """
+        try:
+            # 结果按请求中的顺序返回，重复的ID只处理一次
+            results = {}
+            unique_ids = []
+            for order_id in order_ids:
+                try:
+                    order_id = int(order_id)
+                except (TypeError, ValueError):
+                    results.setdefault(str(order_id), {'id': order_id, 'success': False, 'error': '无效的订单ID'})
+                    continue
+                if order_id not in results:
+                    results[order_id] = None
+                    unique_ids.append(order_id)
+
+            rows = db.session.query(
+                Order.id, Order.user_id, Order.status, Order.total_price, Order.created_at
+            ).filter(Order.id.in_(unique_ids)).with_for_update().all() if unique_ids else []
+            rows_by_id = {row.id: row for row in rows}
+
+            # 按原状态分组
+            groups = {}
+            for order_id in unique_ids:
+                row = rows_by_id.get(order_id)
+                if not row:
+                    results[order_id] = {'id': order_id, 'success': False, 'error': '订单不存在'}
+                elif status not in VALID_TRANSITIONS.get(row.status, []):
+                    results[order_id] = {
+                        'id': order_id,
+                        'success': False,
+                        'error': f'不能从 {row.status} 状态变更为 {status}'
+                    }
+                else:
+                    groups.setdefault(row.status, []).append(row)
+
+            table = Order.__table__
+            for old_status, group in groups.items():
+                result = db.session.execute(
+                    table.update().where(
+                        table.c.id.in_([row.id for row in group]),
+                        table.c.status == old_status
+                    ).values(status=status)
+                )
+                if result.rowcount != len(group):
+                    # 校验后状态被并发修改，整批放弃
+                    db.session.rollback()
+                    return {'success': False, 'errors': ['部分订单状态已变化，请刷新后重试']}
+
+                # 销售汇总按日期合并
+                daily = {}
+                for row in group:
+                    count, revenue = daily.get(row.created_at.date(), (0, 0))
+                    daily[row.created_at.date()] = (count + 1, revenue + row.total_price)
+                for sale_date, (count, revenue) in daily.items():
+                    DailySalesRollup.apply(sale_date, old_status, -count, -revenue)
+                    DailySalesRollup.apply(sale_date, status, count, revenue)
+
+                for row in group:
+                    results[row.id] = {'id': row.id, 'success': True, 'from': old_status, 'to': status}
+
+            if status == 'cancelled':
+                spent = {}
+                for group in groups.values():
+                    for row in group:
+                        spent[row.user_id] = spent.get(row.user_id, 0) + row.total_price
+                for user_id, amount in spent.items():
+                    User.record_cancellation(user_id, amount)
+
+            db.session.commit()
+
+            updated_ids = [row.id for group in groups.values() for row in group]
+            if updated_ids:
+                orders = Order.query.filter(Order.id.in_(updated_ids)).order_by(Order.id).all()
+                for order_dict in OrderService.serialize_orders(orders):
+                    kitchen_queue.apply(order_dict)
+                    publish_order_event('order_status_changed', order_dict)
+
+            return {
+                'success': True,
+                'message': f'已更新 {len(updated_ids)} 个订单',
+                'updated': len(updated_ids),
+                'failed': len(results) - len(updated_ids),
+                'results': list(results.values())
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            return {'success': False, 'errors': [f'批量更新订单状态失败: {str(e)}']}
+
     @staticmethod
     def cancel_order(order_id, user_id=None, is_admin=False):
         """取消订单"""
@@ -247,12 +565,20 @@ class OrderService:
                 return {'success': False, 'errors': ['订单状态不允许取消']}
 
             # 取消订单
+            old_status = order.status
             if order.cancel():
+                DailySalesRollup.move_order(order, old_status, order.status)
+                User.record_cancellation(order.user_id, order.total_price)
                 db.session.commit()
+
+                order_dict = order.to_dict()
+                kitchen_queue.apply(order_dict)
+                publish_order_event('order_status_changed', order_dict)
+
                 return {
                     'success': True,
                     'message': '订单已取消',
-                    'order': order.to_dict()
+                    'order': order_dict
                 }
             else:
                 return {'success': False, 'errors': ['取消订单失败']}
@@ -261,9 +587,45 @@ class OrderService:
             db.session.rollback()
             return {'success': False, 'errors': [f'取消订单失败: {str(e)}']}
 
+    @staticmethod
+    def get_order_counts():
+        """获取订单计数（总数、待处理、准备中、今日）
+
+        单条条件聚合查询完成全部计数，今日条件写成 created_at 的范围以便使用索引
+        """
+        try:
+            today_start = datetime.combine(datetime.now().date(), datetime.min.time())
+            tomorrow_start = today_start + timedelta(days=1)
+
+            total_orders, pending_orders, preparing_orders, today_orders = db.session.query(
+                func.count(Order.id),
+                func.sum(case((Order.status == 'pending', 1), else_=0)),
+                func.sum(case((Order.status == 'preparing', 1), else_=0)),
+                func.sum(case((db.and_(
+                    Order.created_at >= today_start,
+                    Order.created_at < tomorrow_start
+                ), 1), else_=0))
+            ).one()
+
+            return {
+                'success': True,
+                'counts': {
+                    'total_orders': total_orders,
+                    'pending_orders': int(pending_orders or 0),
+                    'preparing_orders': int(preparing_orders or 0),
+                    'today_orders': int(today_orders or 0)
+                }
+            }
+
+        except Exception as e:
+            return {'success': False, 'errors': [f'获取订单计数失败: {str(e)}']}
+
     @staticmethod
     def get_order_statistics(start_date=None, end_date=None):
-        """获取订单统计信息"""
+        """获取订单统计信息
+
+        从每日销售汇总表读取，统计粒度为天，起止日期均包含在内
+        """
         try:
             # 默认查询最近30天
             if not end_date:
@@ -271,43 +633,26 @@ class OrderService:
             if not start_date:
                 start_date = end_date - timedelta(days=30)
 
-            query = Order.query.filter(
-                Order.created_at >= start_date,
-                Order.created_at <= end_date
-            )
-
-            # 总订单数
-            total_orders = query.count()
+            rollups = DailySalesRollup.get_range(start_date.date(), end_date.date())
 
             # 按状态统计
-            status_stats = db.session.query(
-                Order.status,
-                db.func.count(Order.id).label('count')
-            ).filter(
-                Order.created_at >= start_date,
-                Order.created_at <= end_date
-            ).group_by(Order.status).all()
-
             status_summary = {}
-            for status, count in status_stats:
-                status_summary[status] = count
+            total_orders = 0
+            total_amount = 0
+            total_revenue = 0
+            for rollup in rollups:
+                if not rollup.order_count:
+                    continue
+                status_summary[rollup.status] = status_summary.get(rollup.status, 0) + rollup.order_count
+                total_orders += rollup.order_count
+                total_amount += rollup.revenue
 
-            # 总收入（已完成和已准备的订单）
-            total_revenue = db.session.query(
-                db.func.sum(Order.total_price)
-            ).filter(
-                Order.created_at >= start_date,
-                Order.created_at <= end_date,
-                Order.status.in_(['completed', 'ready'])
-            ).scalar() or 0
+                # 总收入（已完成和已准备的订单）
+                if rollup.status in ['completed', 'ready']:
+                    total_revenue += rollup.revenue
 
             # 平均订单金额
-            avg_order_value = db.session.query(
-                db.func.avg(Order.total_price)
-            ).filter(
-                Order.created_at >= start_date,
-                Order.created_at <= end_date
-            ).scalar() or 0
+            avg_order_value = total_amount / total_orders if total_orders else 0
 
             return {
                 'success': True,
@@ -328,31 +673,32 @@ class OrderService:
 
     @staticmethod
     def get_daily_sales(start_date=None, end_date=None):
-        """获取每日销售数据"""
+        """获取每日销售数据
+
+        从每日销售汇总表读取，起止日期均包含在内
+        """
         try:
             if not end_date:
                 end_date = datetime.utcnow()
             if not start_date:
                 start_date = end_date - timedelta(days=7)
 
-            daily_data = db.session.query(
-                db.func.date(Order.created_at).label('date'),
-                db.func.count(Order.id).label('order_count'),
-                db.func.sum(Order.total_price).label('revenue')
-            ).filter(
-                Order.created_at >= start_date,
-                Order.created_at <= end_date,
-                Order.status.in_(['completed', 'ready'])
-            ).group_by(
-                db.func.date(Order.created_at)
-            ).order_by('date').all()
+            rollups = DailySalesRollup.get_range(start_date.date(), end_date.date())
+
+            daily_data = {}
+            for rollup in rollups:
+                if rollup.status not in ['completed', 'ready'] or not rollup.order_count:
+                    continue
+                day = daily_data.setdefault(rollup.sale_date, {'order_count': 0, 'revenue': 0})
+                day['order_count'] += rollup.order_count
+                day['revenue'] += rollup.revenue
 
             sales_data = []
-            for date, order_count, revenue in daily_data:
+            for date, day in sorted(daily_data.items()):
                 sales_data.append({
                     'date': date.isoformat(),
-                    'order_count': order_count,
-                    'revenue': float(revenue) if revenue else 0
+                    'order_count': day['order_count'],
+                    'revenue': float(day['revenue'])
                 })
 
             return {
@@ -0,0 +1,156 @@
+"""热门商品服务"""
+import math
+import threading
+from datetime import datetime, date, timedelta
+from flask import current_app
+from models.menu import MenuItem
+from models.order import Order
+from models.order_item import OrderItem
+from extensions import db
+from services.menu_catalog import menu_catalog
+
+# 后台重算互斥锁（进程内），跨进程由 _claim_refresh 的条件更新保证只有一个进程重算
+_recompute_lock = threading.Lock()
+
+class PopularityService:
+    """热门商品服务类
+
+    下单时只递增 MenuItem.order_count；热度分数按时间衰减批量重算：
+    窗口内每天的销量乘以 0.5 ** (距今天数 / 半衰期) 后累加，
+    分数最高的若干商品标记为 is_popular，排序结果随菜单目录缓存预先计算
+    """
+
+    @staticmethod
+    def record_order(quantities):
+        """下单后递增菜单项的下单次数（quantities 为 菜单ID -> 数量）"""
+        if not quantities:
+            return
+
+        table = MenuItem.__table__
+        db.session.execute(
+            table.update().where(table.c.id == db.bindparam('menu_id')).values(
+                order_count=table.c.order_count + 1,
+                updated_at=table.c.updated_at  # 销量变化不算菜单修改
+            ),
+            [{'menu_id': menu_id} for menu_id in quantities]
+        )
+
+    @staticmethod
+    def recompute():
+        """重算所有菜单项的热度分数和热门标记"""
+        try:
+            config = current_app.config
+            half_life = config.get('POPULARITY_HALF_LIFE_DAYS', 7)
+            window = config.get('POPULARITY_WINDOW_DAYS', 30)
+            top_n = config.get('POPULAR_ITEMS_COUNT', 6)
+
+            now = datetime.utcnow()
+            today = now.date()
+            since = datetime.combine(today - timedelta(days=window), datetime.min.time())
+
+            # 按 商品 × 天 汇总窗口内的销量
+            sale_date = db.func.date(Order.created_at)
+            daily_sales = db.session.query(
+                OrderItem.menu_id,
+                sale_date,
+                db.func.sum(OrderItem.quantity)
+            ).join(Order, Order.id == OrderItem.order_id).filter(
+                Order.created_at >= since,
+                Order.status != 'cancelled'
+            ).group_by(OrderItem.menu_id, sale_date).all()
+
+            scores = {}
+            for menu_id, day, quantity in daily_sales:
+                if isinstance(day, str):
+                    # SQLite 的 DATE() 返回字符串
+                    day = date.fromisoformat(day)
+                age = (today - day).days
+                scores[menu_id] = scores.get(menu_id, 0.0) + int(quantity) * math.pow(0.5, age / half_life)
+
+            ranked = sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
+            popular_ids = {menu_id for menu_id, score in ranked[:top_n] if score > 0}
+
+            table = MenuItem.__table__
+            menu_ids = [row[0] for row in db.session.query(MenuItem.id).all()]
+            if menu_ids:
+                db.session.execute(
+                    table.update().where(table.c.id == db.bindparam('menu_id')).values(
+                        popularity_score=db.bindparam('score'),
+                        is_popular=db.bindparam('popular'),
+                        popularity_updated_at=now,
+                        updated_at=table.c.updated_at
+                    ),
+                    [{
+                        'menu_id': menu_id,
+                        'score': round(scores.get(menu_id, 0.0), 4),
+                        'popular': menu_id in popular_ids
+                    } for menu_id in menu_ids]
+                )
+            db.session.commit()
+            menu_catalog.invalidate()
+
+            return {
+                'success': True,
+                'message': '热度分数已重算',
+                'popular_ids': [menu_id for menu_id, _ in ranked if menu_id in popular_ids]
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            return {'success': False, 'errors': [f'重算热度失败: {str(e)}']}
+
+    @staticmethod
+    def _claim_refresh(interval):
+        """抢占本轮重算：把过期的重算时间更新为当前时间，返回是否抢占成功
+
+        条件更新在数据库中串行执行，多个 worker 同时发现热度过期时只有一个会更新到行
+        """
+        now = datetime.utcnow()
+        table = MenuItem.__table__
+        result = db.session.execute(
+            table.update().where(db.or_(
+                table.c.popularity_updated_at.is_(None),
+                table.c.popularity_updated_at < now - timedelta(seconds=interval)
+            )).values(
+                popularity_updated_at=now,
+                updated_at=table.c.updated_at
+            )
+        )
+        db.session.commit()
+        return result.rowcount > 0
+
+    @staticmethod
+    def refresh_if_stale():
+        """热度分数超过刷新间隔时在后台线程中重算，不阻塞当前请求
+
+        重算时间持久化在菜单表中，通过菜单目录缓存读取，进程重启后不会重复重算
+        """
+        interval = current_app.config.get('POPULARITY_REFRESH_INTERVAL', 600)
+        if not menu_catalog.get_items(available_only=False):
+            return False
+
+        updated_at = menu_catalog.get_popularity_updated_at()
+        if updated_at is not None and datetime.utcnow() - updated_at < timedelta(seconds=interval):
+            return False
+
+        if not _recompute_lock.acquire(blocking=False):
+            return False
+
+        app = current_app._get_current_object()
+
+        def run():
+            try:
+                with app.app_context():
+                    # 先抢占再重算，重算失败时也要等下一个刷新间隔才会再次触发
+                    if not PopularityService._claim_refresh(interval) \
+                            or not PopularityService.recompute()['success']:
+                        # 其它进程已在重算或重算失败：重建缓存以读取最新的重算时间
+                        menu_catalog.invalidate()
+                    db.session.remove()
+            except Exception as e:
+                app.logger.error(f'热度重算失败: {e}')
+            finally:
+                _recompute_lock.release()
+
+        threading.Thread(target=run, daemon=True).start()
+        return True
@@ -0,0 +1,162 @@
+"""Token吊销"""
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from models.revoked_token import RevokedToken
+from extensions import db
+
+# 增量同步时回看的时间窗口，覆盖其它进程中提交较晚、revoked_at 较早的记录
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def _timestamp(value):
+    """UTC naive datetime 转为时间戳（与 JWT 的 iat/exp 一致）"""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class DatabaseRevocationBackend:
+    """吊销记录保存在 revoked_tokens 表中，各 worker 进程通过增量同步共享"""
+
+    def save(self, record):
+        db.session.merge(record)
+        db.session.commit()
+
+    def load(self, since=None):
+        now = datetime.utcnow()
+        query = db.session.query(
+            RevokedToken.jti,
+            RevokedToken.user_id,
+            RevokedToken.token_type,
+            RevokedToken.revoked_at,
+            RevokedToken.expires_at
+        ).filter(RevokedToken.expires_at > now)
+        if since is not None:
+            query = query.filter(RevokedToken.revoked_at >= since - SYNC_OVERLAP)
+        return query.all()
+
+
+class MemoryRevocationBackend:
+    """只在本进程内生效的吊销记录（单进程部署或测试）"""
+
+    def save(self, record):
+        pass
+
+    def load(self, since=None):
+        return []
+
+
+# 可用的吊销记录存储
+REVOCATION_BACKENDS = {
+    'database': DatabaseRevocationBackend,
+    'memory': MemoryRevocationBackend
+}
+
+
+class TokenRevocationStore:
+    """已吊销Token的内存索引
+
+    每个请求的校验只做字典查找：jti 命中或签发时间早于该用户的吊销时间即视为已吊销。
+    本进程吊销时立即生效，其它进程的吊销每隔 TOKEN_REVOCATION_SYNC_INTERVAL 秒
+    从存储增量同步；记录在Token过期后从内存中淘汰，数据库中的过期记录由
+    flask purge-revoked-tokens 清理
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = {}        # jti -> 过期时间戳
+        self._user_cutoffs = {}  # 用户ID -> (吊销时间戳, 过期时间戳)
+        self._loaded = False
+        self._synced_at = 0.0
+        self._high_water = None  # 已同步记录中最新的 revoked_at
+        self._backend = None
+
+    def _get_backend(self):
+        if self._backend is None:
+            name = current_app.config.get('TOKEN_REVOCATION_BACKEND', 'database')
+            if name not in REVOCATION_BACKENDS:
+                raise ValueError(f'未知的Token吊销存储: {name}')
+            self._backend = REVOCATION_BACKENDS[name]()
+        return self._backend
+
+    def _remember(self, jti, user_id, token_type, revoked_at, expires_at):
+        expires = _timestamp(expires_at)
+        if token_type == 'user':
+            cutoff = _timestamp(revoked_at)
+            current = self._user_cutoffs.get(str(user_id))
+            if current is None or current[0] < cutoff:
+                self._user_cutoffs[str(user_id)] = (cutoff, expires)
+        else:
+            self._tokens[jti] = expires
+
+        if self._high_water is None or revoked_at > self._high_water:
+            self._high_water = revoked_at
+
+    def _evict_expired(self):
+        now = time.time()
+        for jti, expires in list(self._tokens.items()):
+            if expires <= now:
+                self._tokens.pop(jti, None)
+        for user_id, (_, expires) in list(self._user_cutoffs.items()):
+            if expires <= now:
+                self._user_cutoffs.pop(user_id, None)
+
+    def _sync(self):
+        interval = current_app.config.get('TOKEN_REVOCATION_SYNC_INTERVAL', 5)
+        if self._loaded and time.monotonic() - self._synced_at < interval:
+            return
+        with self._lock:
+            if self._loaded and time.monotonic() - self._synced_at < interval:
+                return
+            for row in self._get_backend().load(self._high_water if self._loaded else None):
+                self._remember(*row)
+            self._evict_expired()
+            self._loaded = True
+            self._synced_at = time.monotonic()
+
+    def is_revoked(self, jwt_payload):
+        """Token是否已被吊销（flask_jwt_extended 的 blocklist 回调）"""
+        self._sync()
+        if jwt_payload.get('jti') in self._tokens:
+            return True
+
+        cutoff = self._user_cutoffs.get(str(jwt_payload.get('sub')))
+        # iat 精确到秒，同一秒内签发的新Token不受影响
+        return cutoff is not None and jwt_payload.get('iat', 0) < int(cutoff[0])
+
+    def revoke_token(self, jwt_payload):
+        """吊销单个Token（登出）"""
+        record = RevokedToken(
+            jti=jwt_payload['jti'],
+            token_type=jwt_payload.get('type', 'access'),
+            expires_at=datetime.utcfromtimestamp(jwt_payload['exp']),
+            user_id=jwt_payload.get('sub')
+        )
+        self._get_backend().save(record)
+        with self._lock:
+            self._remember(record.jti, record.user_id, record.token_type, record.revoked_at, record.expires_at)
+
+    def revoke_user_tokens(self, user_id):
+        """吊销用户此前签发的全部Token（角色变更、删除用户）"""
+        config = current_app.config
+        lifetime = max(config['JWT_ACCESS_TOKEN_EXPIRES'], config['JWT_REFRESH_TOKEN_EXPIRES'])
+        now = datetime.utcnow()
+        record = RevokedToken(
+            jti=f'user-{user_id}-{uuid.uuid4().hex}',
+            token_type='user',
+            expires_at=now + lifetime,
+            user_id=user_id,
+            revoked_at=now
+        )
+        self._get_backend().save(record)
+        with self._lock:
+            self._remember(record.jti, record.user_id, record.token_type, record.revoked_at, record.expires_at)
+
+    def stats(self):
+        """内存中的吊销记录数"""
+        return {'tokens': len(self._tokens), 'users': len(self._user_cutoffs)}
+
+
+# 全局Token吊销实例
+token_revocation_store = TokenRevocationStore()
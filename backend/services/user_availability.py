@@ -0,0 +1,81 @@
+"""用户名、邮箱可用性索引"""
+import threading
+import time
+from flask import current_app
+from models.user import User
+from extensions import db
+
+
+def _key(value):
+    """统一大小写（与 MySQL 默认排序规则的唯一约束一致）"""
+    return (value or '').strip().lower()
+
+
+class UserAvailabilityIndex:
+    """已占用用户名、邮箱的内存集合
+
+    注册表单实时校验直接查询集合，不访问数据库。本进程内注册、改名、删除用户时增量更新，
+    TTL 到期后全量重建以同步其他进程的变更；集合可能滞后，唯一性最终由数据库约束保证
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usernames = None
+        self._emails = None
+        self._loaded_at = 0.0
+
+    def _build(self):
+        usernames = set()
+        emails = set()
+        for username, email in db.session.query(User.username, User.email).all():
+            usernames.add(_key(username))
+            emails.add(_key(email))
+        self._usernames = usernames
+        self._emails = emails
+        self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        ttl = current_app.config.get('USER_AVAILABILITY_TTL', 300)
+        if self._usernames is not None and time.monotonic() - self._loaded_at < ttl:
+            return
+        with self._lock:
+            if self._usernames is None or time.monotonic() - self._loaded_at >= ttl:
+                self._build()
+
+    def add(self, user):
+        """新增或更新用户后加入集合（未构建时忽略，首次使用时会全量加载）"""
+        with self._lock:
+            if self._usernames is None:
+                return
+            self._usernames.add(_key(user.username))
+            self._emails.add(_key(user.email))
+
+    def discard(self, username=None, email=None):
+        """用户改名、改邮箱或被删除后移除旧值"""
+        with self._lock:
+            if self._usernames is None:
+                return
+            if username:
+                self._usernames.discard(_key(username))
+            if email:
+                self._emails.discard(_key(email))
+
+    def invalidate(self):
+        """使集合失效，下次使用时重建"""
+        with self._lock:
+            self._usernames = None
+            self._emails = None
+
+    def is_username_taken(self, username):
+        """用户名是否已被占用"""
+        self._ensure_loaded()
+        return _key(username) in self._usernames
+
+    def is_email_taken(self, email):
+        """邮箱是否已被占用"""
+        self._ensure_loaded()
+        return _key(email) in self._emails
+
+
+# 全局可用性索引实例
+user_availability_index = UserAvailabilityIndex()
@@ -0,0 +1,119 @@
+"""测试公共夹具"""
+import os
+import sys
+import tempfile
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope='session')
+def app():
+    """测试应用，使用临时文件中的 SQLite 数据库（多线程测试需要真实的连接池）"""
+    db_dir = tempfile.mkdtemp()
+    os.environ['TEST_DATABASE_URL'] = f"sqlite:///{os.path.join(db_dir, 'test.db')}"
+
+    from app import create_app
+    from extensions import db
+    from models import User, MenuItem
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            User('admin', 'admin@example.com', 'admin123', role='admin'),
+            User('alice', 'alice@example.com', 'secret1')
+        ])
+        db.session.add_all([
+            MenuItem(f'拿铁{i}', 10 + i, category='coffee') for i in range(5)
+        ])
+        db.session.commit()
+
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def app_ctx(app):
+    """推入应用上下文"""
+    with app.app_context():
+        yield
+
+
+@pytest.fixture
+def count_queries(app):
+    """统计 with 块内执行的 SQL 语句数
+
+        with count_queries() as counter:
+            ...
+        assert counter.count <= 3
+    """
+    from sqlalchemy import event
+    from extensions import db
+
+    class QueryCounter:
+        def __init__(self, engine):
+            self.engine = engine
+            self.statements = []
+
+        @property
+        def count(self):
+            return len(self.statements)
+
+        def _record(self, conn, cursor, statement, *args):
+            self.statements.append(statement)
+
+        def __enter__(self):
+            event.listen(self.engine, 'before_cursor_execute', self._record)
+            return self
+
+        def __exit__(self, *exc_info):
+            event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    def factory():
+        return QueryCounter(db.engine)
+
+    return factory
+
+
+@pytest.fixture
+def admin_headers(app):
+    """管理员登录后的请求头"""
+    response = app.test_client().post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+@pytest.fixture
+def alice(app_ctx):
+    """普通用户 alice"""
+    from models import User
+    return User.query.filter_by(username='alice').first()
+
+
+@pytest.fixture
+def place_order(alice):
+    """以 alice 身份下单，测试结束后删除订单并重建销售汇总和用户统计"""
+    from extensions import db
+    from models import DailySalesRollup, Order, OrderItem, User
+    from services.order_service import OrderService
+
+    created = []
+
+    def factory(menu_id=1, quantity=1):
+        result = OrderService.create_order(alice.id, {'items': [{'menu_id': menu_id, 'quantity': quantity}]})
+        assert result['success'], result.get('errors')
+        created.append(result['order']['id'])
+        return result['order']
+
+    yield factory
+
+    db.session.rollback()
+    OrderItem.query.filter(OrderItem.order_id.in_(created)).delete(synchronize_session=False)
+    Order.query.filter(Order.id.in_(created)).delete(synchronize_session=False)
+    db.session.commit()
+    DailySalesRollup.rebuild()
+    User.rebuild_order_stats()
@@ -0,0 +1,127 @@
+"""批量更新订单状态"""
+from datetime import date
+import pytest
+from sqlalchemy import event
+from extensions import db
+from models import DailySalesRollup, Order, User
+from services.order_service import OrderService
+
+
+def rollup_today():
+    """今日汇总：状态 -> (订单数, 金额)"""
+    return {
+        row.status: (row.order_count, float(row.revenue))
+        for row in DailySalesRollup.get_range(date.today(), date.today())
+    }
+
+
+def user_stats(user_id):
+    db.session.expire_all()
+    user = db.session.get(User, user_id)
+    return user.get_order_count(), user.get_total_spent()
+
+
+def order_status(order_id):
+    return db.session.query(Order.status).filter(Order.id == order_id).scalar()
+
+
+def test_per_order_results(place_order):
+    pending = place_order()
+    completed = place_order()
+    db.session.get(Order, completed['id']).status = 'completed'
+    db.session.commit()
+
+    result = OrderService.bulk_update_order_status(
+        [pending['id'], completed['id'], 999999, 'abc', pending['id'], str(pending['id'])], 'preparing'
+    )
+
+    assert result['success']
+    assert result['updated'] == 1
+    assert result['failed'] == 3
+    assert result['results'] == [
+        {'id': pending['id'], 'success': True, 'from': 'pending', 'to': 'preparing'},
+        {'id': completed['id'], 'success': False, 'error': '不能从 completed 状态变更为 preparing'},
+        {'id': 999999, 'success': False, 'error': '订单不存在'},
+        {'id': 'abc', 'success': False, 'error': '无效的订单ID'}
+    ]
+    assert order_status(pending['id']) == 'preparing'
+    assert order_status(completed['id']) == 'completed'
+
+
+def test_bulk_cancel_adjusts_rollup_and_user_stats(place_order, alice):
+    pending = place_order(menu_id=1, quantity=2)
+    preparing = place_order(menu_id=2)
+    OrderService.update_order_status(preparing['id'], 'preparing', is_admin=True)
+    rollup_before = rollup_today()
+    order_count_before, spent_before = user_stats(alice.id)
+
+    result = OrderService.bulk_update_order_status([pending['id'], preparing['id']], 'cancelled')
+
+    assert result['success'] and result['updated'] == 2
+    rollup_after = rollup_today()
+    for status, order in (('pending', pending), ('preparing', preparing)):
+        count, revenue = rollup_before[status]
+        assert rollup_after[status] == (count - 1, pytest.approx(revenue - order['total_price']))
+    count, revenue = rollup_before.get('cancelled', (0, 0))
+    assert rollup_after['cancelled'] == (
+        count + 2, pytest.approx(revenue + pending['total_price'] + preparing['total_price'])
+    )
+
+    # 取消的订单仍计入订单数，但从消费金额中扣除
+    order_count, spent = user_stats(alice.id)
+    assert order_count == order_count_before
+    assert spent == pytest.approx(spent_before - pending['total_price'] - preparing['total_price'])
+
+
+def test_concurrent_status_change_rolls_back_batch(place_order, alice):
+    first = place_order()
+    second = place_order()
+    rollup_before = rollup_today()
+    stats_before = user_stats(alice.id)
+
+    # 校验之后、批量 UPDATE 之前，另一个连接把其中一个订单改为制作中
+    changed = []
+
+    def change_status_concurrently(conn, cursor, statement, *args):
+        if not changed and statement.lstrip().upper().startswith('UPDATE ORDERS'):
+            changed.append(statement)
+            with db.engine.begin() as other:
+                other.execute(
+                    Order.__table__.update().where(Order.__table__.c.id == second['id']).values(status='preparing')
+                )
+
+    event.listen(db.engine, 'before_cursor_execute', change_status_concurrently)
+    try:
+        result = OrderService.bulk_update_order_status([first['id'], second['id']], 'cancelled')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', change_status_concurrently)
+
+    assert not result['success']
+    assert result['errors'] == ['部分订单状态已变化，请刷新后重试']
+    assert order_status(first['id']) == 'pending'
+    assert order_status(second['id']) == 'preparing'
+    assert rollup_today() == rollup_before
+    assert user_stats(alice.id) == stats_before
+
+
+def test_bulk_status_endpoint(app, admin_headers, place_order):
+    order = place_order()
+    client = app.test_client()
+
+    response = client.put('/api/orders/status', json={'order_ids': [order['id'], 999999], 'status': 'preparing'},
+                          headers=admin_headers)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['updated'] == 1
+    assert [item['success'] for item in body['results']] == [True, False]
+
+    for payload in (
+        {'order_ids': [order['id']], 'status': 'unknown'},
+        {'order_ids': [], 'status': 'ready'},
+        {'order_ids': str(order['id']), 'status': 'ready'},
+        {'order_ids': list(range(1, 102)), 'status': 'ready'}
+    ):
+        response = client.put('/api/orders/status', json=payload, headers=admin_headers)
+        assert response.status_code == 400, payload
+
+    assert order_status(order['id']) == 'preparing'
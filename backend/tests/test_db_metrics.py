@@ -0,0 +1,53 @@
+"""连接池等待时间统计"""
+import os
+import threading
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+from utils.db_metrics import PoolMetrics
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{os.path.join(tmp_path, 'pool.db')}",
+        poolclass=QueuePool, pool_size=1, max_overflow=0, pool_timeout=0.2
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_wait_and_timeout_are_recorded(engine):
+    metrics = PoolMetrics()
+    metrics.attach(engine)
+
+    held = engine.connect()
+    released = threading.Timer(0.1, held.close)
+    released.start()
+    with engine.connect():
+        pass
+    released.join()
+
+    snapshot = metrics.snapshot(engine)
+    assert snapshot['wait_max_ms'] >= 80
+    assert snapshot['wait_timeouts'] == 0
+
+    held = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    held.close()
+
+    snapshot = metrics.snapshot(engine)
+    assert snapshot['wait_timeouts'] == 1
+    assert snapshot['wait_max_ms'] >= 180
+
+
+def test_pool_wait_tracked_after_dispose(engine):
+    metrics = PoolMetrics()
+    metrics.attach(engine)
+    engine.dispose()
+
+    with engine.connect():
+        pass
+
+    assert metrics.waits == 1
@@ -0,0 +1,27 @@
+"""后厨订单队列"""
+import threading
+from services.kitchen_queue import KitchenQueue
+
+
+def test_get_orders_survives_concurrent_invalidate(app_ctx):
+    queue = KitchenQueue()
+    errors = []
+    stop = threading.Event()
+
+    def invalidate_repeatedly():
+        while not stop.is_set():
+            queue.invalidate()
+
+    invalidator = threading.Thread(target=invalidate_repeatedly)
+    invalidator.start()
+    try:
+        for _ in range(200):
+            try:
+                assert isinstance(queue.get_orders(), list)
+            except Exception as e:
+                errors.append(e)
+    finally:
+        stop.set()
+        invalidator.join()
+
+    assert errors == []
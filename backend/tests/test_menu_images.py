@@ -0,0 +1,25 @@
+"""菜单图片文件清理"""
+import os
+import pytest
+from services.menu_service import MenuService
+
+
+@pytest.mark.parametrize('prefix', ['/', '//'])
+def test_legacy_image_removed(tmp_path, monkeypatch, prefix):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('static/uploads/menu')
+    open('static/uploads/menu/1700000000_latte.jpg', 'wb').close()
+
+    MenuService._remove_image_files(None, f'{prefix}static/uploads/menu/1700000000_latte.jpg')
+
+    assert not os.path.exists('static/uploads/menu/1700000000_latte.jpg')
+
+
+def test_legacy_image_outside_uploads_kept(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('static/uploads')
+    open('config.py', 'w').close()
+
+    MenuService._remove_image_files(None, '//static/uploads/../../config.py')
+
+    assert os.path.exists('config.py')
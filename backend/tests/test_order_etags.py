@@ -0,0 +1,71 @@
+"""订单 ETag"""
+from datetime import datetime
+from extensions import db
+from models import MenuItem, Order, OrderItem, User
+from services.menu_catalog import menu_catalog
+from services.order_service import OrderService
+
+
+def test_user_orders_etag_changes_within_same_second(app_ctx):
+    user = User.query.filter_by(username='alice').first()
+    order = Order(user.id, 'ET0001', 12)
+    db.session.add(order)
+    db.session.commit()
+
+    etags = [OrderService.get_user_orders_etag(user.id)]
+    frozen_updated_at = order.updated_at
+    for status in ('preparing', 'ready', 'completed'):
+        # 模拟秒级精度：状态变化但 updated_at 不变
+        order.status = status
+        order.updated_at = frozen_updated_at
+        db.session.commit()
+        etags.append(OrderService.get_user_orders_etag(user.id))
+
+    db.session.delete(order)
+    db.session.commit()
+
+    assert len(set(etags)) == len(etags)
+
+
+def _create_order_with_item(user, order_number, menu_item):
+    order = Order(user.id, order_number, menu_item.price)
+    db.session.add(order)
+    db.session.flush()
+    db.session.add(OrderItem(order.id, menu_item.id, 1, menu_item.price))
+    db.session.commit()
+    return order
+
+
+def test_order_etags_ignore_popularity_and_catalog_rebuilds(app_ctx):
+    user = User.query.filter_by(username='alice').first()
+    menu_item = MenuItem.query.filter_by(name='拿铁1').first()
+    order = _create_order_with_item(user, 'ET0002', menu_item)
+
+    order_etag = OrderService.get_order_etag(order.id, user.id)
+    list_etag = OrderService.get_user_orders_etag(user.id)
+
+    # 销量、热度变化和菜单缓存重建不改变订单数据
+    table = MenuItem.__table__
+    db.session.execute(table.update().where(table.c.id == menu_item.id).values(
+        popularity_score=table.c.popularity_score + 5,
+        popularity_updated_at=datetime.utcnow(),
+        updated_at=table.c.updated_at
+    ))
+    db.session.commit()
+    menu_catalog.invalidate()
+
+    assert OrderService.get_order_etag(order.id, user.id) == order_etag
+    assert OrderService.get_user_orders_etag(user.id) == list_etag
+
+    # 订单项中嵌入的菜单名称变化时 ETag 随之变化
+    original_name = menu_item.name
+    menu_item.name = '拿铁1（大杯）'
+    db.session.commit()
+    try:
+        assert OrderService.get_order_etag(order.id, user.id) != order_etag
+        assert OrderService.get_user_orders_etag(user.id) != list_etag
+    finally:
+        menu_item.name = original_name
+        OrderItem.query.filter_by(order_id=order.id).delete()
+        db.session.delete(order)
+        db.session.commit()
@@ -0,0 +1,77 @@
+"""并发下单的订单号唯一性"""
+import threading
+from sqlalchemy.exc import OperationalError
+from extensions import db
+from models import Order, OrderSequence, User
+from services.order_service import OrderService
+
+# 并发下单线程数，超过默认连接池容量（5 + 10）
+CONCURRENT_ORDERS = 20
+
+
+def test_concurrent_orders_get_unique_numbers(app):
+    with app.app_context():
+        user_id = User.query.filter_by(username='alice').first().id
+        db.session.remove()
+
+    barrier = threading.Barrier(CONCURRENT_ORDERS)
+    results = []
+    results_lock = threading.Lock()
+
+    def place_order():
+        with app.app_context():
+            barrier.wait()
+            result = OrderService.create_order(user_id, {'items': [{'menu_id': 1, 'quantity': 1}]})
+            with results_lock:
+                results.append(result)
+
+    threads = [threading.Thread(target=place_order) for _ in range(CONCURRENT_ORDERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert len(results) == CONCURRENT_ORDERS
+    assert all(result['success'] for result in results), [r.get('errors') for r in results if not r['success']]
+
+    numbers = [result['order']['order_number'] for result in results]
+    assert len(set(numbers)) == CONCURRENT_ORDERS
+
+    with app.app_context():
+        stored = [number for (number,) in db.session.query(Order.order_number).filter(
+            Order.order_number.in_(numbers)
+        )]
+        assert sorted(stored) == sorted(numbers)
+
+
+def test_first_order_of_day_continues_existing_numbers(app_ctx):
+    table = OrderSequence.__table__
+    db.session.add(Order(User.query.filter_by(username='alice').first().id, 'CO200001010007', 10))
+    db.session.commit()
+
+    assert OrderSequence.next_value('20000101') == 8
+    assert OrderSequence.next_value('20000101') == 9
+
+    db.session.execute(table.delete().where(table.c.date_key == '20000101'))
+    Order.query.filter_by(order_number='CO200001010007').delete()
+    db.session.commit()
+
+
+def test_deadlock_while_creating_day_row_is_retried(app_ctx, monkeypatch):
+    table = OrderSequence.__table__
+    original = OrderSequence._last_used_value
+    calls = []
+
+    def deadlock_once(conn, date_key):
+        calls.append(date_key)
+        if len(calls) == 1:
+            raise OperationalError('INSERT', {}, Exception(1213, 'Deadlock found when trying to get lock'))
+        return original(conn, date_key)
+
+    monkeypatch.setattr(OrderSequence, '_last_used_value', staticmethod(deadlock_once))
+
+    assert OrderSequence.next_value('20000102') == 1
+    assert len(calls) == 2
+
+    db.session.execute(table.delete().where(table.c.date_key == '20000102'))
+    db.session.commit()
@@ -0,0 +1,62 @@
+"""订单列表查询次数"""
+import pytest
+from extensions import db
+from models import Order, OrderItem, User
+from services.order_service import OrderService, MAX_ORDERS_PER_PAGE
+
+# 管理员订单列表每页的查询上限：COUNT、订单联表用户、订单项联表菜单项
+MAX_LIST_QUERIES = 3
+
+
+@pytest.fixture
+def orders(app_ctx):
+    """为普通用户创建 50 个订单，每个订单 3 个订单项"""
+    user = User.query.filter_by(username='alice').first()
+    created = []
+    for index in range(50):
+        order = Order(user.id, f'QC{index:04d}', 33)
+        db.session.add(order)
+        db.session.flush()
+        for menu_id in (1, 2, 3):
+            db.session.add(OrderItem(order.id, menu_id, 1, 10 + menu_id))
+        created.append(order.id)
+    db.session.commit()
+
+    yield created
+
+    OrderItem.query.filter(OrderItem.order_id.in_(created)).delete(synchronize_session=False)
+    Order.query.filter(Order.id.in_(created)).delete(synchronize_session=False)
+    db.session.commit()
+
+
+@pytest.mark.parametrize('per_page', [1, 50])
+def test_admin_order_list_query_count(orders, count_queries, per_page):
+    db.session.expire_all()
+    with count_queries() as counter:
+        result = OrderService.get_all_orders(page=1, per_page=per_page)
+
+    assert result['success']
+    assert len(result['orders']) == per_page
+    assert all(len(order['order_items']) == 3 and order['user']['username'] == 'alice' for order in result['orders'])
+    assert counter.count <= MAX_LIST_QUERIES, counter.statements
+
+
+@pytest.mark.parametrize('per_page', [1, 50])
+def test_admin_order_cursor_page_query_count(orders, count_queries, per_page):
+    db.session.expire_all()
+    with count_queries() as counter:
+        result = OrderService.get_all_orders(per_page=per_page, cursor='')
+
+    assert result['success']
+    assert len(result['orders']) == per_page
+    assert counter.count <= MAX_LIST_QUERIES, counter.statements
+
+
+@pytest.mark.parametrize('per_page, expected', [(0, 1), (-5, 1), (1000, MAX_ORDERS_PER_PAGE)])
+@pytest.mark.parametrize('cursor', [None, ''])
+def test_admin_order_list_clamps_per_page(orders, per_page, expected, cursor):
+    result = OrderService.get_all_orders(per_page=per_page, cursor=cursor)
+
+    assert result['success'], result.get('errors')
+    assert result['per_page'] == expected
+    assert len(result['orders']) == min(expected, Order.query.count())
@@ -0,0 +1,43 @@
+"""订单搜索"""
+import pytest
+from extensions import db
+from models import Order, User
+from services.order_search import OrderSearchService
+
+
+@pytest.fixture
+def alice_order(app_ctx):
+    user = User.query.filter_by(username='alice').first()
+    order = Order(user.id, 'OS0001', 12)
+    db.session.add(order)
+    db.session.commit()
+    yield order
+    db.session.delete(order)
+    db.session.commit()
+
+
+def search(keyword):
+    mode, criterion = OrderSearchService.build_filter(keyword)
+    return mode, [order.order_number for order in Order.query.filter(criterion).all()]
+
+
+@pytest.mark.parametrize('keyword', ['%', '_', 'a_', '\\'])
+def test_short_keyword_wildcards_match_literally(alice_order, keyword):
+    assert search(keyword) == ('partial', [])
+
+
+def test_short_keyword_matches_username_prefix(alice_order):
+    mode, order_numbers = search('al')
+    assert mode == 'partial'
+    assert 'OS0001' in order_numbers
+
+
+def test_admin_user_search_escapes_wildcards(app, admin_headers):
+    client = app.test_client()
+
+    response = client.get('/api/users/', query_string={'keyword': '_'}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.get_json()['users'] == []
+
+    response = client.get('/api/users/', query_string={'keyword': 'lic'}, headers=admin_headers)
+    assert [user['username'] for user in response.get_json()['users']] == ['alice']
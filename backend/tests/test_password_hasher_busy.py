@@ -0,0 +1,56 @@
+"""密码哈希线程池繁忙时返回 503"""
+import pytest
+from models import User
+from utils.password_hasher import PasswordHasherBusy, password_hasher
+
+
+@pytest.fixture
+def busy_hasher(monkeypatch):
+    def busy(*args, **kwargs):
+        raise PasswordHasherBusy('服务器繁忙，请稍后重试')
+
+    monkeypatch.setattr(password_hasher, 'hash', busy)
+    monkeypatch.setattr(password_hasher, 'verify', busy)
+
+
+@pytest.fixture
+def alice_headers(app):
+    """在哈希繁忙之前登录（依赖它的测试需将其排在 busy_hasher 之前）"""
+    response = app.test_client().post('/api/auth/login', json={'username': 'alice', 'password': 'secret1'})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+def assert_busy(response):
+    assert response.status_code == 503
+    assert response.get_json() == {'success': False, 'errors': ['服务器繁忙，请稍后重试'], 'busy': True}
+
+
+def test_login_busy(app, busy_hasher):
+    response = app.test_client().post('/api/auth/login', json={'username': 'alice', 'password': 'secret1'})
+    assert_busy(response)
+
+
+def test_register_busy(app, busy_hasher):
+    response = app.test_client().post('/api/auth/register', json={
+        'username': 'carol', 'email': 'carol@example.com', 'password': 'secret3'
+    })
+    assert_busy(response)
+
+    with app.app_context():
+        assert User.query.filter_by(username='carol').first() is None
+
+
+def test_change_password_busy(app, alice_headers, busy_hasher):
+    response = app.test_client().post('/api/auth/change-password', json={
+        'old_password': 'secret1', 'new_password': 'secret9'
+    }, headers=alice_headers)
+    assert_busy(response)
+
+
+def test_admin_reset_password_busy(app, admin_headers, busy_hasher):
+    with app.app_context():
+        alice_id = User.query.filter_by(username='alice').first().id
+
+    response = app.test_client().post(f'/api/users/{alice_id}/reset-password', json={'new_password': 'secret9'},
+                                      headers=admin_headers)
+    assert_busy(response)
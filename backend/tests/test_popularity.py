@@ -0,0 +1,70 @@
+"""热度重算的触发条件"""
+from datetime import datetime, timedelta
+import pytest
+from extensions import db
+from models import MenuItem
+from services import popularity_service
+from services.menu_catalog import menu_catalog
+from services.menu_service import MenuService
+from services.popularity_service import PopularityService
+
+
+def wait_for_background_recompute():
+    with popularity_service._recompute_lock:
+        pass
+
+
+@pytest.fixture
+def stale_popularity(app_ctx):
+    table = MenuItem.__table__
+    db.session.execute(table.update().values(popularity_updated_at=None))
+    db.session.commit()
+    menu_catalog.invalidate()
+    yield
+    wait_for_background_recompute()
+
+
+def test_refresh_persists_and_survives_restart(stale_popularity):
+    assert PopularityService.refresh_if_stale()
+    wait_for_background_recompute()
+
+    assert menu_catalog.get_popularity_updated_at() is not None
+    assert not PopularityService.refresh_if_stale()
+
+    # 模拟进程重启：进程内缓存清空后仍从数据库读到最近的重算时间
+    menu_catalog.invalidate()
+    assert not PopularityService.refresh_if_stale()
+
+
+def test_only_one_claim_per_interval(stale_popularity):
+    assert PopularityService._claim_refresh(600)
+    assert not PopularityService._claim_refresh(600)
+
+    updated_at = db.session.query(db.func.max(MenuItem.popularity_updated_at)).scalar()
+    assert datetime.utcnow() - updated_at < timedelta(seconds=5)
+
+
+def test_popular_endpoint_refreshes_once(app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(PopularityService, 'refresh_if_stale', staticmethod(lambda: calls.append(1)))
+
+    response = app.test_client().get('/api/menu/popular')
+
+    assert response.status_code == 200
+    assert len(calls) == 1
+
+
+def test_popular_endpoint_uses_configured_count(app, monkeypatch):
+    limits = []
+
+    def get_popular_items(limit=10):
+        limits.append(limit)
+        return {'success': True, 'popular_items': []}
+
+    monkeypatch.setattr(MenuService, 'get_popular_items', staticmethod(get_popular_items))
+    monkeypatch.setitem(app.config, 'POPULAR_ITEMS_COUNT', 3)
+
+    response = app.test_client().get('/api/menu/popular')
+
+    assert response.status_code == 200
+    assert limits == [3]
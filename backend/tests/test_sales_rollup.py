@@ -0,0 +1,60 @@
+"""每日销售汇总与订单表一致"""
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import func
+from extensions import db
+from models import DailySalesRollup, Order
+from services.order_service import OrderService
+
+
+def statistics_from_orders(start_date, end_date):
+    """直接聚合订单表，口径与 get_order_statistics 相同（按天，首尾均包含）"""
+    rows = db.session.query(Order.status, func.count(Order.id), func.sum(Order.total_price)).filter(
+        Order.created_at >= datetime.combine(start_date.date(), datetime.min.time()),
+        Order.created_at < datetime.combine(end_date.date() + timedelta(days=1), datetime.min.time())
+    ).group_by(Order.status).all()
+
+    total_orders = sum(count for _, count, _ in rows)
+    total_amount = sum(float(amount) for _, _, amount in rows)
+    return {
+        'total_orders': total_orders,
+        'total_revenue': pytest.approx(sum(
+            float(amount) for status, _, amount in rows if status in ('completed', 'ready')
+        )),
+        'avg_order_value': pytest.approx(total_amount / total_orders if total_orders else 0),
+        'status_breakdown': {status: count for status, count, _ in rows}
+    }
+
+
+def rollup_statistics(start_date, end_date):
+    result = OrderService.get_order_statistics(start_date, end_date)
+    assert result['success'], result.get('errors')
+    statistics = result['statistics']
+    statistics.pop('period')
+    return statistics
+
+
+def test_rollup_matches_orders_after_create_cancel_and_bulk_cancel(app, place_order):
+    # 其它测试直接写入的订单不经过汇总，先重建得到一致的起点
+    DailySalesRollup.rebuild()
+
+    orders = [place_order(menu_id=menu_id, quantity=menu_id) for menu_id in (1, 2, 3, 4, 5)]
+    OrderService.cancel_order(orders[0]['id'], is_admin=True)
+    OrderService.update_order_status(orders[1]['id'], 'preparing', is_admin=True)
+    OrderService.bulk_update_order_status([orders[1]['id'], orders[2]['id']], 'cancelled')
+    OrderService.update_order_status(orders[3]['id'], 'preparing', is_admin=True)
+    OrderService.update_order_status(orders[3]['id'], 'ready', is_admin=True)
+
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=30)
+    expected = statistics_from_orders(start_date, end_date)
+    assert expected['status_breakdown']['cancelled'] >= 3
+
+    assert rollup_statistics(start_date, end_date) == expected
+
+    # 重建命令得到相同的结果
+    result = app.test_cli_runner().invoke(args=['rebuild-sales-rollup'])
+    assert result.exit_code == 0, result.output
+    db.session.expire_all()
+
+    assert rollup_statistics(start_date, end_date) == expected
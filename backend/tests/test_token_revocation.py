@@ -0,0 +1,112 @@
+"""Token吊销"""
+import time
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token, decode_token
+from extensions import db
+from models import RevokedToken, User
+from services.token_revocation import MemoryRevocationBackend, TokenRevocationStore, token_revocation_store
+
+
+def old_token(user_id, seconds_ago=10):
+    """模拟较早签发的Token（iat 早于随后的吊销时间）"""
+    return create_access_token(
+        identity=user_id, additional_claims={'iat': int(time.time()) - seconds_ago}
+    )
+
+
+def auth(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def test_logout_revokes_access_and_refresh_tokens(client):
+    tokens = client.post('/api/auth/login', json={'username': 'alice', 'password': 'secret1'}).get_json()
+    access_token, refresh_token = tokens['access_token'], tokens['refresh_token']
+    assert client.get('/api/auth/verify-token', headers=auth(access_token)).status_code == 200
+
+    response = client.post('/api/auth/logout', json={'refresh_token': refresh_token}, headers=auth(access_token))
+    assert response.status_code == 200
+
+    assert client.get('/api/auth/verify-token', headers=auth(access_token)).status_code == 401
+    assert client.post('/api/auth/refresh', headers=auth(refresh_token)).status_code == 401
+
+    # 重新登录签发的新Token不受影响
+    tokens = client.post('/api/auth/login', json={'username': 'alice', 'password': 'secret1'}).get_json()
+    assert client.get('/api/auth/verify-token', headers=auth(tokens['access_token'])).status_code == 200
+
+
+def test_role_change_revokes_earlier_tokens(app, client, admin_headers):
+    with app.app_context():
+        alice_id = User.query.filter_by(username='alice').first().id
+        token = old_token(alice_id)
+    assert client.get('/api/auth/verify-token', headers=auth(token)).status_code == 200
+
+    try:
+        response = client.put(f'/api/users/{alice_id}', json={'role': 'admin'}, headers=admin_headers)
+        assert response.status_code == 200
+
+        with app.app_context():
+            assert token_revocation_store.is_revoked(decode_token(token, allow_expired=True))
+        assert client.get('/api/auth/verify-token', headers=auth(token)).status_code == 401
+    finally:
+        client.put(f'/api/users/{alice_id}', json={'role': 'user'}, headers=admin_headers)
+
+
+def test_user_deletion_revokes_earlier_tokens(app, client, admin_headers):
+    with app.app_context():
+        user = User('bob', 'bob@example.com', 'secret2')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        token = old_token(user_id)
+        assert not token_revocation_store.is_revoked(decode_token(token))
+
+    assert client.delete(f'/api/users/{user_id}', headers=admin_headers).status_code == 200
+
+    with app.app_context():
+        assert token_revocation_store.is_revoked(decode_token(token, allow_expired=True))
+
+
+def test_sync_picks_up_revocations_from_other_processes(app_ctx):
+    store = TokenRevocationStore()
+    alice = User.query.filter_by(username='alice').first()
+    payload = decode_token(create_access_token(identity=alice.id))
+    assert not store.is_revoked(payload)
+
+    # 另一个进程登出：只写入数据库，不经过本进程的内存索引
+    db.session.add(RevokedToken(
+        jti=payload['jti'],
+        token_type='access',
+        expires_at=datetime.utcfromtimestamp(payload['exp']),
+        user_id=alice.id
+    ))
+    db.session.commit()
+
+    # 同步间隔内仍使用内存索引
+    assert not store.is_revoked(payload)
+
+    store._synced_at = 0.0
+    assert store.is_revoked(payload)
+
+
+def test_expired_entries_are_evicted(app_ctx):
+    store = TokenRevocationStore()
+    store._backend = MemoryRevocationBackend()
+    now = int(time.time())
+    store.revoke_token({'jti': 'expired-jti', 'type': 'access', 'exp': now - 10, 'sub': 1})
+    store.revoke_token({'jti': 'live-jti', 'type': 'access', 'exp': now + 600, 'sub': 1})
+    with store._lock:
+        store._remember('user-expired', 1, 'user', datetime.utcnow() - timedelta(hours=2),
+                        datetime.utcnow() - timedelta(hours=1))
+    assert store.stats() == {'tokens': 2, 'users': 1}
+
+    store._synced_at = 0.0
+    store.is_revoked({'jti': 'other', 'sub': 1, 'iat': now})
+
+    assert store.stats() == {'tokens': 1, 'users': 0}
+    assert store.is_revoked({'jti': 'live-jti', 'sub': 1, 'iat': now})
@@ -0,0 +1,40 @@
+"""用户名、邮箱唯一约束冲突"""
+import pytest
+import routes.user
+from models import User
+from utils.auth_utils import duplicate_user_field
+
+
+class FakeIntegrityError(Exception):
+    def __init__(self, message):
+        super().__init__(message)
+        self.orig = message
+
+
+@pytest.mark.parametrize('message, field', [
+    ("(1062, \"Duplicate entry 'username@x.com' for key 'users.email'\")", 'email'),
+    ("(1062, \"Duplicate entry 'email' for key 'users.username'\")", 'username'),
+    ("(1062, \"Duplicate entry 'bob' for key 'ix_users_username'\")", 'username'),
+    ('UNIQUE constraint failed: users.email', 'email'),
+    ('duplicate key value violates unique constraint "users_username_key"', 'username'),
+    ("(1062, \"Duplicate entry 'username' for key 'orders.order_number'\")", None),
+    ('NOT NULL constraint failed: users.username', None)
+])
+def test_duplicate_user_field_matches_constraint_name(message, field):
+    assert duplicate_user_field(FakeIntegrityError(message)) == field
+
+
+def test_admin_update_maps_unique_race_to_400(app, monkeypatch):
+    client = app.test_client()
+    login = client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+    headers = {'Authorization': f"Bearer {login.get_json()['access_token']}"}
+
+    with app.app_context():
+        alice_id = User.query.filter_by(username='alice').first().id
+
+    # 模拟检查通过之后邮箱被并发占用
+    monkeypatch.setattr(routes.user, 'find_taken_fields', lambda *args, **kwargs: set())
+    response = client.put(f'/api/users/{alice_id}', json={'email': 'admin@example.com'}, headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == ['邮箱已被使用']
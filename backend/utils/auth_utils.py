@@ -1,9 +1,46 @@
 """认证工具函数"""
+import re
+import time
 from functools import wraps
-from flask import jsonify, current_app
+from flask import jsonify, current_app, g
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+from sqlalchemy import or_
 from models.user import User
 
+# 角色变更或删除时间（用户ID -> 时间戳），早于该时间签发的Token中的角色声明不再可信
+_role_changed_at = {}
+
+def mark_role_changed(user_id):
+    """记录用户角色变更，之前签发的Token回退到数据库校验角色"""
+    now = time.time()
+    _role_changed_at[int(user_id)] = now
+
+    # 清理已超过Token有效期的记录
+    expires = current_app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds()
+    for key, changed_at in list(_role_changed_at.items()):
+        if now - changed_at > expires:
+            _role_changed_at.pop(key, None)
+
+def get_current_role():
+    """获取当前用户角色
+
+    优先使用Token中的角色声明，不查询数据库；Token没有角色声明（旧Token）
+    或签发后角色发生过变更时回退到数据库，用户不存在时返回None
+    """
+    claims = get_jwt()
+    role = claims.get('role')
+    changed_at = _role_changed_at.get(int(get_jwt_identity()))
+
+    if role is None or (changed_at is not None and claims.get('iat', 0) <= changed_at):
+        current_user = get_current_user()
+        return current_user.role if current_user else None
+
+    return role
+
+def current_user_is_admin():
+    """当前用户是否为管理员"""
+    return get_current_role() == 'admin'
+
 def token_required(f):
     """Token验证装饰器"""
     @wraps(f)
@@ -21,10 +58,8 @@ def admin_required(f):
     def decorated_function(*args, **kwargs):
         try:
             verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            current_user = User.query.get(current_user_id)
 
-            if not current_user or current_user.role != 'admin':
+            if get_current_role() != 'admin':
                 return jsonify({'message': '需要管理员权限'}), 403
 
             return f(*args, **kwargs)
@@ -33,11 +68,12 @@ def admin_required(f):
     return decorated_function
 
 def get_current_user():
-    """获取当前登录用户"""
+    """获取当前登录用户（同一请求内只查询一次）"""
     try:
         verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        return User.query.get(current_user_id)
+        if '_current_user' not in g:
+            g._current_user = User.query.get(get_jwt_identity())
+        return g._current_user
     except:
         return None
 
@@ -56,14 +92,14 @@ def user_or_admin_required(f):
         try:
             verify_jwt_in_request()
             current_user_id = get_jwt_identity()
-            current_user = User.query.get(current_user_id)
+            role = get_current_role()
 
-            if not current_user:
+            if not role:
                 return jsonify({'message': '用户不存在'}), 401
 
             # 检查是否为管理员或操作自己的资源
             user_id = kwargs.get('user_id')
-            if current_user.role != 'admin' and user_id and str(current_user_id) != str(user_id):
+            if role != 'admin' and user_id and str(current_user_id) != str(user_id):
                 return jsonify({'message': '只能操作自己的资源'}), 403
 
             return f(*args, **kwargs)
@@ -133,6 +169,65 @@ def user_exists(username=None, email=None):
 
     return False
 
+def find_taken_fields(username=None, email=None, exclude_user_id=None):
+    """一次查询检查用户名、邮箱是否已被（其他）用户使用，返回被占用的字段集合"""
+    conditions = []
+    if username:
+        conditions.append(User.username == username)
+    if email:
+        conditions.append(User.email == email)
+    if not conditions:
+        return set()
+
+    query = User.query.with_entities(User.username, User.email).filter(or_(*conditions))
+    if exclude_user_id is not None:
+        query = query.filter(User.id != exclude_user_id)
+
+    # 按数据库排序规则命中的行，逐个判断是哪个字段冲突（MySQL 默认不区分大小写）
+    taken = set()
+    for row_username, row_email in query.all():
+        if username and row_username.lower() == username.lower():
+            taken.add('username')
+        if email and row_email.lower() == email.lower():
+            taken.add('email')
+    return taken
+
+# 用户表唯一约束/索引名 -> 字段（列级 UNIQUE、SQLAlchemy 的 ix_ 索引、uq_ 约束以及 PostgreSQL 默认命名）
+USER_UNIQUE_KEYS = {
+    name: field
+    for field in ('username', 'email')
+    for name in (field, f'users.{field}', f'ix_users_{field}', f'uq_users_{field}', f'users_{field}_key')
+}
+
+# 唯一约束冲突信息中的约束名：MySQL、PostgreSQL、SQLite
+_DUPLICATE_KEY_PATTERNS = (
+    re.compile(r"for key '([^']+)'"),
+    re.compile(r'unique constraint "([^"]+)"'),
+    re.compile(r'unique constraint failed: ([\w.]+)')
+)
+
+def duplicate_user_field(error):
+    """从唯一约束冲突（IntegrityError）中识别冲突的字段，无法识别时返回 None
+
+    只按约束名判断，不看冲突的值（MySQL 的错误信息中包含重复的值，邮箱里可能含有 username 字样）：
+    MySQL: Duplicate entry 'x' for key 'users.username'；SQLite: UNIQUE constraint failed: users.username
+    """
+    message = str(getattr(error, 'orig', error)).lower()
+    for pattern in _DUPLICATE_KEY_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return USER_UNIQUE_KEYS.get(match.group(1))
+    return None
+
+def duplicate_user_error(error):
+    """用户名、邮箱唯一约束冲突的错误信息，无法识别冲突字段时返回通用信息"""
+    field = duplicate_user_field(error)
+    if field == 'username':
+        return '用户名已被使用'
+    if field == 'email':
+        return '邮箱已被使用'
+    return '用户名或邮箱已被使用'
+
 import os
 from werkzeug.utils import secure_filename
 
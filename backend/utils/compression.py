@@ -0,0 +1,68 @@
+"""响应压缩"""
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # 未安装 brotli 时只提供 gzip
+    brotli = None
+
+# 需要压缩的响应类型
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+    'application/javascript',
+    'image/svg+xml'
+}
+
+
+def _encodings():
+    """服务端支持的编码，按优先顺序"""
+    return ['br', 'gzip'] if brotli else ['gzip']
+
+
+def _compress(data, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(data, quality=config.get('BROTLI_QUALITY', 4))
+    return gzip.compress(data, compresslevel=config.get('GZIP_LEVEL', 6))
+
+
+def init_compression(app):
+    """按 Accept-Encoding 压缩超过 COMPRESS_MIN_SIZE 字节的响应
+
+    流式响应（如 SSE）、文件直传、部分内容响应以及已编码的响应不压缩；
+    压缩后 ETag 改为弱校验，条件请求仍按弱比较命中
+    """
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        data = response.get_data()
+        if len(data) < app.config.get('COMPRESS_MIN_SIZE', 1024):
+            return response
+
+        encoding = request.accept_encodings.best_match(_encodings())
+        if not encoding:
+            return response
+
+        response.set_data(_compress(data, encoding, app.config))
+        response.headers['Content-Encoding'] = encoding
+
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
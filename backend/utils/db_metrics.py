@@ -0,0 +1,136 @@
+"""数据库连接池监控"""
+import threading
+import time
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+# 计算等待时间分位数时保留的最近样本数
+WAIT_SAMPLE_SIZE = 1000
+
+
+class PoolMetrics:
+    """连接池指标
+
+    通过连接池事件统计连接的建立、检出、失效次数和检出持有时间；
+    连接池没有“开始等待连接”的事件，获取连接的等待时间通过包装连接池的 _do_get 测量
+    （包括排队等待空闲连接和新建连接的时间），等待超时单独计数。
+    配合连接池自身的占用情况在健康检查接口中输出
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.total_hold_time = 0.0
+        self.max_hold_time = 0.0
+        self.waits = 0
+        self.wait_timeouts = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self._local = threading.local()
+        self._wait_samples = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    def attach(self, engine):
+        """监听引擎连接池事件"""
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'invalidate', self._on_invalidate)
+        # engine.dispose() 会重建连接池，需要重新包装
+        event.listen(engine, 'engine_disposed', lambda disposed: self._wrap_pool(disposed.pool))
+        self._wrap_pool(engine.pool)
+
+    def _wrap_pool(self, pool):
+        """测量从连接池获取连接的等待时间"""
+        do_get = pool._do_get
+
+        def timed_do_get():
+            # QueuePool._do_get 会递归调用自身，只计时最外层
+            if getattr(self._local, 'waiting', False):
+                return do_get()
+
+            self._local.waiting = True
+            started = time.perf_counter()
+            try:
+                return do_get()
+            except PoolTimeoutError:
+                with self._lock:
+                    self.wait_timeouts += 1
+                raise
+            finally:
+                self._local.waiting = False
+                self._record_wait(time.perf_counter() - started)
+
+        pool._do_get = timed_do_get
+
+    def _record_wait(self, wait_time):
+        with self._lock:
+            self._wait_samples.append(wait_time)
+            self.waits += 1
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def _wait_percentiles(self):
+        with self._lock:
+            samples = sorted(self._wait_samples)
+        if not samples:
+            return 0, 0
+
+        def percentile(fraction):
+            return round(samples[min(int(len(samples) * fraction), len(samples) - 1)] * 1000, 3)
+
+        return percentile(0.5), percentile(0.95)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checkout_at'] = time.perf_counter()
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        checkout_at = connection_record.info.pop('checkout_at', None)
+        with self._lock:
+            self.checkins += 1
+            if checkout_at is not None:
+                hold_time = time.perf_counter() - checkout_at
+                self.total_hold_time += hold_time
+                self.max_hold_time = max(self.max_hold_time, hold_time)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, engine):
+        """当前连接池指标"""
+        pool = engine.pool
+        data = {
+            'pool_class': type(pool).__name__,
+            'connects': self.connects,
+            'checkouts': self.checkouts,
+            'invalidations': self.invalidations,
+            'avg_hold_ms': round(self.total_hold_time / self.checkins * 1000, 3) if self.checkins else 0,
+            'max_hold_ms': round(self.max_hold_time * 1000, 3)
+        }
+        # 连接池分配连接不保证先来先得，等待时间通常是长尾分布，平均值和最大值比分位数更敏感
+        data['avg_wait_ms'] = round(self.total_wait_time / self.waits * 1000, 3) if self.waits else 0
+        data['wait_p50_ms'], data['wait_p95_ms'] = self._wait_percentiles()
+        data['wait_max_ms'] = round(self.max_wait_time * 1000, 3)
+        data['wait_timeouts'] = self.wait_timeouts
+
+        # 仅 QueuePool 提供容量信息
+        for name in ('size', 'checkedout', 'overflow', 'checkedin'):
+            method = getattr(pool, name, None)
+            if callable(method):
+                data[name] = method()
+
+        return data
+
+
+# 全局连接池指标实例
+pool_metrics = PoolMetrics()
@@ -0,0 +1,53 @@
+"""HTTP 条件请求工具"""
+import hashlib
+from flask import request, current_app
+
+# 订单数据因用户而异且变化频繁：允许浏览器保存但每次都需校验，共享缓存不得保存
+PRIVATE_REVALIDATE = 'private, no-cache'
+
+
+def make_etag(*parts):
+    """由若干版本标识（ID、状态、更新时间等）生成 ETag"""
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def public_cache_control():
+    """菜单等公开数据的 Cache-Control
+
+    浏览器每次都凭 ETag 校验（菜单修改后管理员立即可见），
+    CDN/代理可缓存 MENU_HTTP_MAX_AGE 秒，为 0 时同样每次校验
+    """
+    max_age = current_app.config.get('MENU_HTTP_MAX_AGE', 60)
+    if not max_age:
+        return 'public, no-cache'
+    return f'public, max-age=0, s-maxage={max_age}, stale-while-revalidate={max_age}'
+
+
+def _apply_headers(response, etag, cache_control, vary=None):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    if vary:
+        response.vary.add(vary)
+    return response
+
+
+def not_modified(etag, cache_control, vary=None):
+    """If-None-Match 命中时返回 304 响应，否则返回 None
+
+    应在查询和序列化数据之前调用，命中时直接返回
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = current_app.response_class(status=304)
+    return _apply_headers(response, etag, cache_control, vary)
+
+
+def cacheable(response, etag, cache_control, vary=None):
+    """为响应设置 ETag 和 Cache-Control（错误响应原样返回）
+
+    response 可以是视图函数的返回值形式 (body, status)
+    """
+    response = current_app.make_response(response)
+    if response.status_code != 200:
+        return response
+    return _apply_headers(response, etag, cache_control, vary)
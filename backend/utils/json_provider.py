@@ -0,0 +1,95 @@
+"""JSON 序列化"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时使用标准库编码
+    orjson = None
+
+
+def _default(obj):
+    """标准库和 orjson 都不能直接编码的类型：与 to_dict() 的约定一致，金额转为数字、时间转为 ISO 格式"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """标准库 JSON 编码，Decimal、日期时间的处理与 OrjsonProvider 相同"""
+
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """基于 orjson 的 JSON 编码
+
+    直接输出 UTF-8 字节，不做 ASCII 转义；传入 orjson 不支持的参数（如自定义 cls）时
+    回退到标准库编码
+    """
+
+    _SUPPORTED_KWARGS = {'indent', 'sort_keys', 'ensure_ascii', 'separators', 'default'}
+
+    def _options(self, indent=None, sort_keys=None):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _dumps_bytes(self, obj, **kwargs):
+        if not self._SUPPORTED_KWARGS.issuperset(kwargs):
+            return super().dumps(obj, **kwargs).encode('utf-8')
+        try:
+            return orjson.dumps(
+                obj,
+                default=kwargs.get('default', self.default),
+                option=self._options(kwargs.get('indent'), kwargs.get('sort_keys'))
+            )
+        except TypeError:
+            # 例如超出 64 位的整数，交给标准库处理
+            return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = None
+        if self.compact is None and self._app.debug or self.compact is False:
+            indent = 2
+        return self._app.response_class(
+            self._dumps_bytes(obj, indent=indent) + b'\n',
+            mimetype=self.mimetype
+        )
+
+
+# 可用的 JSON 编码实现
+JSON_PROVIDERS = {
+    'stdlib': StdlibJSONProvider,
+    'orjson': OrjsonProvider
+}
+
+
+def init_json_provider(app):
+    """按配置设置应用的 JSON 编码（orjson 未安装时使用标准库）"""
+    name = app.config.get('JSON_PROVIDER', 'orjson')
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f'未知的 JSON 编码实现: {name}')
+    if name == 'orjson' and orjson is None:
+        name = 'stdlib'
+
+    app.json_provider_class = JSON_PROVIDERS[name]
+    app.json = app.json_provider_class(app)
+    return app.json
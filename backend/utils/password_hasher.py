@@ -0,0 +1,65 @@
+"""密码哈希"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from extensions import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """等待哈希线程超时（登录高峰时快速失败，而不是让所有请求排队）"""
+
+
+class PasswordHasher:
+    """有并发上限的 bcrypt 哈希
+
+    哈希和校验在固定大小的线程池中执行（bcrypt 计算期间释放 GIL），同时进行的
+    哈希数不超过 PASSWORD_HASH_WORKERS，另有 PASSWORD_HASH_QUEUE 个请求可以排队等待，
+    超出时等待 PASSWORD_HASH_WAIT 秒后抛出 PasswordHasherBusy。
+    这样登录高峰时 CPU 只被有限数量的哈希占用，其它接口的请求仍能得到处理
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+
+    def _ensure_pool(self):
+        if self._executor is not None:
+            return
+        with self._lock:
+            if self._executor is None:
+                config = current_app.config
+                workers = config.get('PASSWORD_HASH_WORKERS', 2)
+                self._slots = threading.BoundedSemaphore(workers + config.get('PASSWORD_HASH_QUEUE', 16))
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+
+    def _run(self, func, *args):
+        self._ensure_pool()
+        if not self._slots.acquire(timeout=current_app.config.get('PASSWORD_HASH_WAIT', 5)):
+            raise PasswordHasherBusy('服务器繁忙，请稍后重试')
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """按当前配置的 BCRYPT_LOG_ROUNDS 生成哈希"""
+        rounds = current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        return self._run(bcrypt.generate_password_hash, password, rounds).decode('utf-8')
+
+    def verify(self, hashed, password):
+        """校验密码"""
+        return self._run(bcrypt.check_password_hash, hashed, password)
+
+    @staticmethod
+    def needs_rehash(hashed):
+        """哈希的 cost 与当前配置不同时需要重新哈希"""
+        try:
+            rounds = int(hashed.split('$')[2])
+        except (AttributeError, IndexError, ValueError):
+            return True
+        return rounds != current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
+
+
+# 全局密码哈希实例
+password_hasher = PasswordHasher()
@@ -12,6 +12,10 @@ CREATE TABLE users (
     password VARCHAR(255) NOT NULL,
     role ENUM('admin', 'user') DEFAULT 'user',
     phone VARCHAR(20),
+    order_count INT NOT NULL DEFAULT 0,
+    total_spent DECIMAL(12,2) NOT NULL DEFAULT 0,
+    first_order_at DATETIME NULL,
+    last_order_at DATETIME NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_username (username),
@@ -67,6 +71,33 @@ CREATE TABLE order_items (
     INDEX idx_menu_id (menu_id)
 );
 
+-- 订单号计数器表（按天原子递增）
+CREATE TABLE order_sequences (
+    date_key VARCHAR(8) PRIMARY KEY,
+    last_value INT NOT NULL DEFAULT 0
+);
+
+-- 每日销售汇总表（按日期 × 订单状态增量维护）
+CREATE TABLE daily_sales_rollup (
+    sale_date DATE NOT NULL,
+    status ENUM('pending', 'preparing', 'ready', 'completed', 'cancelled') NOT NULL,
+    order_count INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (sale_date, status)
+);
+
+-- 已吊销Token表（登出、角色变更；过期后可清理）
+CREATE TABLE revoked_tokens (
+    jti VARCHAR(64) PRIMARY KEY,
+    user_id INT NULL,
+    token_type ENUM('access', 'refresh', 'user') NOT NULL,
+    revoked_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    INDEX idx_user_id (user_id),
+    INDEX idx_revoked_at (revoked_at),
+    INDEX idx_expires_at (expires_at)
+);
+
 -- 插入管理员默认账户 (密码: admin123)
 INSERT INTO users (username, email, password, role, phone) VALUES
 ('admin', 'admin@coffee.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewFu6JsygKJrnZvK', 'admin', '13800138000');
@@ -21,12 +21,17 @@ CREATE TABLE IF NOT EXISTS menu_items (
     original_price DECIMAL(10, 2),
     category VARCHAR(50) DEFAULT 'coffee',
     image_url VARCHAR(255),
+    image_hash VARCHAR(64),
+    image_variants JSON,
     is_available BOOLEAN DEFAULT TRUE,
     is_popular BOOLEAN DEFAULT FALSE,
     tags JSON,
     order_count INT DEFAULT 0,
+    popularity_score DOUBLE DEFAULT 0,
+    popularity_updated_at DATETIME NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_image_hash (image_hash)
 );
 
 -- 订单表
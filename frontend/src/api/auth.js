@@ -11,6 +11,11 @@ export default {
     return request.post('/auth/register', userData)
   },
 
+  // 检查用户名、邮箱是否可用
+  checkAvailability(params) {
+    return request.get('/auth/availability', params)
+  },
+
   // 刷新Token
   refreshToken() {
     return request.post('/auth/refresh')
@@ -31,9 +36,13 @@ export default {
     return request.post('/auth/change-password', passwordData)
   },
 
-  // 登出
-  logout() {
-    return request.post('/auth/logout')
+  // 登出（服务端吊销访问Token和刷新Token，需在清除本地Token前调用）
+  logout(accessToken, refreshToken) {
+    return request.post(
+      '/auth/logout',
+      { refresh_token: refreshToken },
+      { headers: { Authorization: `Bearer ${accessToken}` } }
+    )
   },
 
   // 验证Token
@@ -96,8 +96,8 @@ const request = {
   },
 
   // POST请求
-  post(url, data = {}) {
-    return api.post(url, data)
+  post(url, data = {}, config = {}) {
+    return api.post(url, data, config)
   },
 
   // PUT请求
@@ -1,4 +1,5 @@
 import request from './index'
+import { useAuthStore } from '@/store/auth'
 
 export default {
   // 创建订单
@@ -41,6 +42,11 @@ export default {
     return request.get('/orders/sales/daily', params)
   },
 
+  // 批量更新订单状态（管理员）
+  bulkUpdateOrderStatus(orderIds, status) {
+    return request.put('/orders/status', { order_ids: orderIds, status })
+  },
+
   // 获取订单数量统计（管理员）
   getOrderCount() {
     return request.get('/orders/count')
@@ -59,5 +65,21 @@ export default {
   // 搜索订单（管理员）
   searchOrders(params) {
     return request.get('/orders/search', params)
+  },
+
+  // 获取后厨订单队列（管理员）
+  getKitchenQueue(params = {}) {
+    return request.get('/orders/queue', params)
+  },
+
+  // 订阅订单实时事件（SSE），返回 EventSource，页面卸载时调用 close()
+  subscribeOrderEvents(onEvent) {
+    const baseURL = import.meta.env.VITE_API_BASE_URL || '/api'
+    const token = useAuthStore().token
+    const source = new EventSource(`${baseURL}/orders/stream?jwt=${encodeURIComponent(token)}`)
+    const handler = (event) => onEvent(event.type, JSON.parse(event.data))
+    source.addEventListener('order_created', handler)
+    source.addEventListener('order_status_changed', handler)
+    return source
   }
 }
\ No newline at end of file
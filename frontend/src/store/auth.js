@@ -72,6 +72,11 @@ export const useAuthStore = defineStore('auth', () => {
   }
 
   const logout = () => {
+    // 通知服务端吊销Token（需在清除Token前发出）
+    if (token.value) {
+      authApi.logout(token.value, refreshToken.value).catch(console.error)
+    }
+
     // 清除状态
     user.value = null
     token.value = null
@@ -81,9 +86,6 @@ export const useAuthStore = defineStore('auth', () => {
     localStorage.removeItem('token')
     localStorage.removeItem('refreshToken')
     localStorage.removeItem('user')
-
-    // 调用登出API（可选）
-    authApi.logout().catch(console.error)
   }
 
   const checkAuthStatus = async () => {